@@ -1,5 +1,7 @@
 import streamlit as st
-from PIL import Image
+
+from scouting.recursos import imagen
+from scouting.rendimiento import cerrar_pagina, iniciar_pagina, medir
 
 st.set_page_config(
     page_title="RRC - Scouting Porteros",
@@ -7,19 +9,21 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+iniciar_pagina("Inicio")
 
-# Logo en sidebar - usando st.sidebar.image para mayor control de tamaño
-try:
-    st.sidebar.image("real_racing_club.png", width=150)
-except:
-    pass
+with medir('imagenes'):
+    # Logo en sidebar - usando st.sidebar.image para mayor control de tamaño
+    # (reducido una sola vez al doble del ancho mostrado, para pantallas de alta densidad)
+    try:
+        st.sidebar.image(imagen("real_racing_club.png", 300), width=150)
+    except:
+        pass
 
-# Imagen de estadio a lo ancho
-try:
-    estadio = Image.open("estadio_rrc.jpeg")
-    st.image(estadio, use_container_width=True)
-except:
-    pass
+    # Imagen de estadio a lo ancho
+    try:
+        st.image(imagen("estadio_rrc.jpeg", 1600), width='stretch')
+    except:
+        pass
 
 st.title("🧤 Sistema de Scouting de Porteros - Real Racing Club")
 st.markdown("""
@@ -32,7 +36,11 @@ Utiliza el menú lateral para navegar entre las diferentes secciones:
 - **Plots Rendimiento Porteros**: Visualizaciones de rendimiento
 - **Comparativa Porteros**: Compara múltiples porteros
 - **Perfil Individual**: Análisis detallado de un portero
+- **Porteros Similares**: Encuentra porteros con un perfil parecido al de otro
+- **Administración de Caché**: Memoria y aciertos de las cachés de la app
 
 ---
 Selecciona una página del menú lateral para comenzar.
 """)
+
+cerrar_pagina()
@@ -0,0 +1,120 @@
+"""
+Coste de importaciones de cada página en un proceso nuevo
+
+Uso: python -m benchmarks.importaciones [--paginas ...] [--top 8] [--salida FICHERO]
+
+Cada página se ejecuta una vez con streamlit.testing en un intérprete nuevo con
+-X importtime, después de una app mínima que ya ha cargado Streamlit: lo que
+se mide es lo que la página añade (pandas, pyarrow, matplotlib, plotly...).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.paginas import PAGINAS, RAIZ
+
+MARCA_INICIO = '--- inicio pagina ---'
+MARCA_FIN = '--- fin pagina ---'
+
+
+def _worker(pagina):
+    import streamlit.logger
+    streamlit.logger.set_log_level('error')
+    from streamlit.testing.v1 import AppTest
+
+    # Streamlit y su runtime ya cargados antes de la marca
+    AppTest.from_string('import streamlit as st\nst.write("")').run()
+
+    sys.stderr.write(f'{MARCA_INICIO}\n')
+    sys.stderr.flush()
+    inicio = time.perf_counter()
+    at = AppTest.from_file(str(RAIZ / pagina), default_timeout=600)
+    at.run()
+    segundos = time.perf_counter() - inicio
+    sys.stderr.write(f'{MARCA_FIN}\n')
+    print(json.dumps({'segundos': segundos, 'excepciones': [str(e.value) for e in at.exception]}))
+
+
+def importaciones_de_la_pagina(stderr):
+    """
+    [(módulo, microsegundos acumulados)] de las importaciones de primer nivel entre las marcas
+    """
+    lineas = stderr.splitlines()
+    try:
+        lineas = lineas[lineas.index(MARCA_INICIO) + 1:lineas.index(MARCA_FIN)]
+    except ValueError:
+        return []
+    registros = []
+    for linea in lineas:
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, nombre = linea[len('import time:'):].split('|')
+        # Cada nivel de anidamiento añade dos espacios delante del nombre
+        registros.append((len(nombre) - len(nombre.lstrip()), nombre.strip(), int(acumulado)))
+    if not registros:
+        return []
+    nivel_superior = min(nivel for nivel, _, _ in registros)
+    return [(nombre, us) for nivel, nombre, us in registros if nivel == nivel_superior]
+
+
+def medir_pagina(pagina):
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'benchmarks.importaciones', '--worker', pagina],
+        cwd=RAIZ, capture_output=True, text=True,
+        env=dict(os.environ, SCOUTING_LOG_RENDIMIENTO='')
+    )
+    if proceso.returncode != 0:
+        return {'error': proceso.stderr[-2000:]}
+    resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+
+    por_paquete = defaultdict(int)
+    for nombre, us in importaciones_de_la_pagina(proceso.stderr):
+        por_paquete[nombre.split('.')[0]] += us
+    return {
+        'segundos_pagina': resultado['segundos'],
+        'segundos_importaciones': sum(por_paquete.values()) / 1e6,
+        'paquetes': {
+            paquete: us / 1e6 for paquete, us in sorted(por_paquete.items(), key=lambda item: -item[1])
+        },
+        'excepciones': resultado['excepciones'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--paginas', nargs='+', default=PAGINAS)
+    parser.add_argument('--top', type=int, default=8, help='paquetes más caros a mostrar por página')
+    parser.add_argument('--salida', help='JSON con el informe completo')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker)
+        return
+
+    informe = {}
+    for pagina in args.paginas:
+        medida = informe[pagina] = medir_pagina(pagina)
+        if 'error' in medida:
+            print(f'{pagina}: error\n{medida["error"]}', flush=True)
+            continue
+        print(
+            f'{pagina:<42} página {medida["segundos_pagina"]:6.2f} s   '
+            f'importaciones {medida["segundos_importaciones"]:6.2f} s',
+            flush=True
+        )
+        for paquete, segundos in list(medida['paquetes'].items())[:args.top]:
+            print(f'    {paquete:<30} {segundos * 1000:8.1f} ms')
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        print(f'Resultados en {args.salida}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+"""
+Benchmark headless de todas las páginas con el consolidado real y versiones escaladas
+
+Uso: python -m benchmarks.paginas [--escalas 1 10 100] [--repeticiones 3] [--salida FICHERO]
+
+Las escalas mayores que 1 usan consolidados sintéticos (benchmarks.sintetico)
+de escala × filas reales. Cada dataset se mide en un proceso nuevo (cachés en
+memoria y en disco vacías): primero las etapas de datos compartidas y después
+cada página con streamlit.testing, en su estado inicial, en un rerun y en
+varios estados representativos de los widgets, con el desglose por etapa de
+medir() de cada ejecución. El resultado se escribe en JSON para poder
+comparar commits.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.sintetico import generar_consolidado
+
+RAIZ = Path(__file__).resolve().parent.parent
+RUTA_CSV_REAL = RAIZ / 'CONSOLIDADO_metricas_por_90.csv'
+
+PAGINAS = [
+    'app.py',
+    'pages/1_Busqueda_Porteros.py',
+    'pages/2_Busqueda_Por_Perfil.py',
+    'pages/3_Plots_Rendimiento_Porteros.py',
+    'pages/4_Comparativa_Porteros.py',
+    'pages/5_Perfil_Individual.py',
+    'pages/6_Porteros_Similares.py',
+    'pages/7_Administracion_Cache.py',
+]
+
+
+def _widget(at, tipo, etiqueta):
+    for widget in getattr(at, tipo):
+        if widget.label == etiqueta:
+            return widget
+    raise KeyError(f'{tipo} "{etiqueta}" no encontrado')
+
+
+def _primera_competencia(at):
+    competencias = _widget(at, 'multiselect', 'Competencias')
+    competencias.set_value(competencias.options[:1])
+
+
+# Estados representativos de los widgets de cada página, aplicados sobre el estado inicial
+ESCENARIOS = {
+    'pages/1_Busqueda_Porteros.py': {
+        'ordenar_por_edad': lambda at: (
+            _widget(at, 'selectbox', 'Ordenar por').set_value('age'),
+            _widget(at, 'selectbox', 'Orden').set_value('Ascendente'),
+        ),
+        'pagina_3': lambda at: _widget(at, 'number_input', 'Página').set_value(3),
+        'una_competencia': _primera_competencia,
+    },
+    'pages/2_Busqueda_Por_Perfil.py': {
+        'score_global_50': lambda at: _widget(at, 'slider', 'Score Global').set_value((50.0, 100.0)),
+        'una_competencia': _primera_competencia,
+        'scores_relativos': lambda at: (
+            _primera_competencia(at),
+            _widget(at, 'checkbox', 'Scores relativos al pool filtrado').check(),
+        ),
+        'umbral_270': lambda at: _widget(at, 'number_input', 'Minutos mínimos del pool').set_value(270),
+    },
+    'pages/3_Plots_Rendimiento_Porteros.py': {
+        'una_competencia': _primera_competencia,
+        'con_nombres': lambda at: _widget(at, 'checkbox', 'Mostrar nombres de jugadores en gráfico').check(),
+        'color_burbuja': lambda at: (
+            lambda selector: selector.set_value(selector.options[1])
+        )(_widget(at, 'selectbox', 'Variable Color Burbuja')),
+    },
+    'pages/4_Comparativa_Porteros.py': {
+        'tres_jugadores': lambda at: (
+            lambda selector: selector.set_value(selector.options[:3])
+        )(_widget(at, 'multiselect', 'Buscar y seleccionar jugadores')),
+        'umbral_270': lambda at: _widget(at, 'number_input', 'Minutos mínimos del pool').set_value(270),
+    },
+    'pages/5_Perfil_Individual.py': {
+        'pool_300_minutos': lambda at: _widget(at, 'slider', 'Minutos Mínimos').set_value(300),
+        'otro_jugador': lambda at: (
+            lambda selector: selector.set_value(selector.options[1])
+        )(_widget(at, 'selectbox', 'Buscar y seleccionar portero')),
+        'scores_relativos': lambda at: _widget(at, 'checkbox', 'Scores relativos al pool de comparación').check(),
+    },
+    'pages/6_Porteros_Similares.py': {
+        'euclidea': lambda at: _widget(at, 'radio', 'Distancia').set_value('euclidea'),
+        'una_competencia': _primera_competencia,
+    },
+}
+
+
+def _medir(tiempos, nombre, funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    tiempos[nombre] = time.perf_counter() - inicio
+    return resultado
+
+
+def _resumen(muestras, etapas):
+    """
+    Tiempos de pared de las muestras y, por etapa de medir(), la mediana y el
+    desglose de cada muestra (0 en las muestras en que la etapa no se ejecutó)
+    """
+    nombres = sorted({etapa for desglose in etapas for etapa in desglose})
+    return {
+        'mediana': statistics.median(muestras),
+        'min': min(muestras),
+        'max': max(muestras),
+        'muestras': muestras,
+        'etapas_mediana': {
+            etapa: statistics.median(desglose.get(etapa, 0.0) for desglose in etapas) for etapa in nombres
+        },
+        'etapas': etapas,
+    }
+
+
+def _ejecutar(at):
+    """
+    (segundos de pared, excepciones, {etapa: segundos}) de una ejecución; las
+    etapas suman los registros de la página y de sus fragmentos
+    """
+    from scouting.rendimiento import registros_capturados
+
+    with registros_capturados() as registros:
+        inicio = time.perf_counter()
+        at.run()
+        segundos = time.perf_counter() - inicio
+    etapas = {}
+    for registro in registros:
+        for etapa, duracion in registro['etapas'].items():
+            etapas[etapa] = etapas.get(etapa, 0.0) + duracion
+    return segundos, [str(e.value) for e in at.exception], etapas
+
+
+def medir_dataset(repeticiones, paginas):
+    """
+    Mide las etapas compartidas y las páginas en el proceso actual
+    (SCOUTING_CONSOLIDADO y SCOUTING_CACHE_DIR ya deben estar fijadas)
+    """
+    import streamlit.logger
+    streamlit.logger.set_log_level('error')
+    from streamlit.testing.v1 import AppTest
+
+    from scouting.datos import MINUTOS_MINIMOS, RUTA_CONSOLIDADO, RUTA_CONSOLIDADO_PARQUET, load_data, version_datos
+    from scouting.filtros import indice_filtros
+    from scouting.ingesta import artefacto_vigente
+    from scouting.jugadores import indice_jugadores
+    from scouting.percentiles import calcular_cubo_percentiles, calcular_percentiles_variables
+    from scouting.scores import calcular_scores, indice_filtros_scores
+    from scouting.similares import indice_similitud
+
+    parquet_vigente = artefacto_vigente(RUTA_CONSOLIDADO, RUTA_CONSOLIDADO_PARQUET)
+    etapas = {}
+    version = _medir(etapas, 'version', version_datos)
+    df, _ = _medir(etapas, 'datos', lambda: load_data(version))
+    _medir(etapas, 'cubo_percentiles', lambda: calcular_cubo_percentiles(version, MINUTOS_MINIMOS))
+    _medir(etapas, 'scores', lambda: calcular_scores(version, MINUTOS_MINIMOS))
+    _medir(etapas, 'percentiles_variables', lambda: calcular_percentiles_variables(version, MINUTOS_MINIMOS))
+    _medir(etapas, 'indice_filtros', lambda: indice_filtros(version))
+    _medir(etapas, 'indice_filtros_scores', lambda: indice_filtros_scores(version, MINUTOS_MINIMOS))
+    _medir(etapas, 'indice_similitud', lambda: indice_similitud(version, MINUTOS_MINIMOS))
+    _medir(etapas, 'indice_jugadores', lambda: indice_jugadores(version))
+
+    resultados = {}
+    for pagina in paginas:
+        ruta = str(RAIZ / pagina)
+        at = AppTest.from_file(ruta, default_timeout=3600)
+        inicial, excepciones, etapas_inicial = _ejecutar(at)
+        reruns = [_ejecutar(at) for _ in range(repeticiones)]
+        escenarios = {}
+        for nombre, aplicar in ESCENARIOS.get(pagina, {}).items():
+            muestras, etapas_muestras = [], []
+            for _ in range(repeticiones):
+                at = AppTest.from_file(ruta, default_timeout=3600)
+                at.run()
+                aplicar(at)
+                segundos, errores, etapas_muestra = _ejecutar(at)
+                muestras.append(segundos)
+                etapas_muestras.append(etapas_muestra)
+                excepciones += errores
+            escenarios[nombre] = _resumen(muestras, etapas_muestras)
+        resultados[pagina] = {
+            'inicial': inicial,
+            'etapas_inicial': etapas_inicial,
+            'rerun': _resumen([r[0] for r in reruns], [r[2] for r in reruns]),
+            'escenarios': escenarios,
+            'excepciones': sorted(set(excepciones)),
+        }
+
+    return {
+        'filas': len(df),
+        'columnas': df.shape[1],
+        'parquet_vigente_al_empezar': parquet_vigente,
+        'etapas': etapas,
+        'paginas': resultados,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 10, 100, 1000],
+                        help='factores de escala del consolidado (1 = datos reales)')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--paginas', nargs='+', default=PAGINAS)
+    parser.add_argument('--directorio-datos', type=Path, default=Path(tempfile.gettempdir()) / 'scouting_benchmark',
+                        help='dónde se generan (y reutilizan) los consolidados sintéticos')
+    parser.add_argument('--salida', type=Path, default=Path('benchmark_paginas.json'))
+    parser.add_argument('--worker', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # Proceso hijo: mide un dataset y deja el resultado en el fichero indicado
+        args.worker.write_text(json.dumps(medir_dataset(args.repeticiones, args.paginas)))
+        return
+
+    args.directorio_datos.mkdir(parents=True, exist_ok=True)
+    filas_reales = len(pd.read_csv(RUTA_CSV_REAL, usecols=[0]))
+    datasets = []
+    for escala in args.escalas:
+        if escala == 1:
+            ruta_csv = RUTA_CSV_REAL
+        else:
+            ruta_csv = args.directorio_datos / f'sintetico_x{escala}.csv'
+            if not ruta_csv.exists():
+                print(f'Generando {ruta_csv.name}...', flush=True)
+                generar_consolidado(ruta_csv, escala * filas_reales)
+
+        with tempfile.TemporaryDirectory() as directorio_cache:
+            resultado = Path(directorio_cache) / 'resultado.json'
+            # Sin log de rendimiento: las mediciones del benchmark no son tráfico real
+            env = dict(os.environ, SCOUTING_CONSOLIDADO=str(ruta_csv), SCOUTING_CACHE_DIR=directorio_cache,
+                       SCOUTING_LOG_RENDIMIENTO='')
+            print(f'Escala x{escala}...', flush=True)
+            proceso = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.paginas', '--worker', str(resultado),
+                 '--repeticiones', str(args.repeticiones), '--paginas', *args.paginas],
+                cwd=RAIZ, env=env, capture_output=True, text=True
+            )
+            if proceso.returncode != 0:
+                datasets.append({'escala': escala, 'error': proceso.stderr[-2000:]})
+                print(f'  error (código {proceso.returncode})', flush=True)
+                continue
+            medida = json.loads(resultado.read_text())
+
+        datasets.append({'escala': escala, 'consolidado': str(ruta_csv), **medida})
+        for pagina, datos in medida['paginas'].items():
+            print(f'  {pagina:<42} inicial {datos["inicial"]:7.2f} s   rerun {datos["rerun"]["mediana"]:7.2f} s', flush=True)
+
+    informe = {
+        'commit': _commit(),
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeticiones': args.repeticiones,
+        'datasets': datasets,
+    }
+    args.salida.write_text(json.dumps(informe, indent=2, ensure_ascii=False))
+    print(f'Resultados en {args.salida}')
+
+
+if __name__ == '__main__':
+    main()
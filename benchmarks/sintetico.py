@@ -0,0 +1,292 @@
+"""
+Generador de consolidados sintéticos con el mismo esquema que CONSOLIDADO_metricas_por_90.csv
+
+Uso: python -m benchmarks.sintetico --filas 1000000 --salida FICHERO [--competencias N] [--temporadas N]
+
+Se ajusta una cópula gaussiana al consolidado real: las distribuciones
+marginales de cada columna numérica son las empíricas de cada competencia y la
+estructura de correlación es la de las puntuaciones normales (rangos) de todo
+el consolidado. Cada competencia sintética toma las marginales de una
+competencia real y el patrón de nulos de cada fila se copia de una fila real de
+esa competencia, así que se conservan los nulos conjuntos (altura y peso,
+métricas sin acciones...). Los valores salen de interpolar entre los cuantiles
+reales, de modo que los pct_ siguen en [0, 1].
+
+El fichero se escribe por bloques: la memoria no depende del número de filas.
+"""
+import argparse
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+RAIZ = Path(__file__).resolve().parent.parent
+RUTA_CSV_REAL = RAIZ / 'CONSOLIDADO_metricas_por_90.csv'
+
+FILAS_POR_BLOQUE = 50_000
+
+# Filas medias por competencia en el consolidado real, para escalar el número de grupos
+FILAS_POR_COMPETENCIA = 60
+
+_ALFABETO_ID = np.array(list('0123456789abcdefghijklmnopqrstuvwxyz'))
+
+
+def _fda_normal(z):
+    """
+    Función de distribución normal estándar (Abramowitz-Stegun 7.1.26, error < 1.5e-7)
+    """
+    x = np.abs(z) / math.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    polinomio = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - polinomio * np.exp(-x * x)
+    return 0.5 * (1 + np.sign(z) * erf)
+
+
+def _puntuaciones_normales(valores):
+    """
+    Rangos de cada columna llevados a la normal estándar (NaN se mantiene)
+    """
+    rangos = pd.DataFrame(valores).rank(pct=True).to_numpy()
+    n = np.sum(~np.isnan(valores), axis=0)
+    # Reescalar a (0, 1) abierto antes de invertir la normal
+    u = (rangos * n - 0.5) / n
+    return np.sqrt(2) * _erfinv(2 * u - 1)
+
+
+def _erfinv(y):
+    """
+    Inversa de la función error (aproximación de Giles) para matrices
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        w = -np.log((1 - y) * (1 + y))
+        central = w < 5
+        w1 = w - 2.5
+        p1 = 2.81022636e-08
+        for c in (3.43273939e-07, -3.5233877e-06, -4.39150654e-06, 0.00021858087, -0.00125372503,
+                  -0.00417768164, 0.246640727, 1.50140941):
+            p1 = c + p1 * w1
+        w2 = np.sqrt(w) - 3
+        p2 = -0.000200214257
+        for c in (0.000100950558, 0.00134934322, -0.00367342844, 0.00573950773, -0.0076224613,
+                  0.00943887047, 1.00167406, 2.83297682):
+            p2 = c + p2 * w2
+        return np.where(central, p1, p2) * y
+
+
+@dataclass
+class ModeloConsolidado:
+    """
+    Parámetros aprendidos del consolidado real
+    """
+    columnas: list          # orden de columnas del CSV
+    numericas: list         # columnas generadas con la cópula
+    enteras: list           # numéricas que se redondean
+    tipos: dict             # {columna numérica: dtype en el consolidado real}
+    espejos: dict           # {columna: columna de la que es copia exacta}
+    competencias: list      # competencias reales
+    proporciones: np.ndarray  # peso de cada competencia real en filas
+    equipos: np.ndarray     # equipos distintos de cada competencia real
+    temporadas: list        # temporadas reales
+    cuantiles: list         # [competencia][columna] -> valores ordenados sin NaN
+    nulos: list             # [competencia] -> máscara de nulos de sus filas reales
+    cholesky: np.ndarray    # factor de la matriz de correlación de la cópula
+
+    @classmethod
+    def ajustar(cls, df):
+        numericas_todas = df.select_dtypes('number').columns.tolist()
+
+        # Columnas duplicadas (height_master...): se copian en vez de generarse
+        espejos = {}
+        for i, columna in enumerate(numericas_todas):
+            for original in numericas_todas[:i]:
+                if original not in espejos and df[columna].equals(df[original]):
+                    espejos[columna] = original
+                    break
+        numericas = [col for col in numericas_todas if col not in espejos]
+        enteras = [
+            col for col in numericas
+            if pd.api.types.is_integer_dtype(df[col]) or (df[col].dropna() % 1 == 0).all()
+        ]
+
+        valores = df[numericas].to_numpy(dtype=float)
+        z = _puntuaciones_normales(valores)
+        correlacion = pd.DataFrame(z).corr().fillna(0).to_numpy(copy=True)
+        np.fill_diagonal(correlacion, 1)
+        # Correlación por pares: proyectar a definida positiva antes de factorizar
+        autovalores, autovectores = np.linalg.eigh(correlacion)
+        correlacion = (autovectores * np.clip(autovalores, 1e-6, None)) @ autovectores.T
+        escala = np.sqrt(np.diag(correlacion))
+        correlacion = correlacion / np.outer(escala, escala)
+
+        competencias = sorted(df['Competencia'].unique())
+        codigos = pd.Categorical(df['Competencia'], categories=competencias).codes
+        globales = [np.sort(valores[~np.isnan(valores[:, j]), j]) for j in range(len(numericas))]
+        cuantiles, nulos = [], []
+        for c in range(len(competencias)):
+            bloque = valores[codigos == c]
+            columnas = []
+            for j in range(len(numericas)):
+                reales = np.sort(bloque[~np.isnan(bloque[:, j]), j])
+                columnas.append(reales if len(reales) else globales[j])
+            cuantiles.append(columnas)
+            nulos.append(np.isnan(bloque))
+
+        return cls(
+            columnas=df.columns.tolist(),
+            numericas=numericas,
+            enteras=enteras,
+            tipos=df[numericas_todas].dtypes.to_dict(),
+            espejos=espejos,
+            competencias=competencias,
+            proporciones=np.bincount(codigos, minlength=len(competencias)) / len(df),
+            equipos=df.groupby('Competencia')['TeamName'].nunique().reindex(competencias).to_numpy(),
+            temporadas=sorted(df['Temporada'].astype(str).unique()),
+            cuantiles=cuantiles,
+            nulos=nulos,
+            cholesky=np.linalg.cholesky(correlacion),
+        )
+
+    def temporadas_sinteticas(self, n):
+        """
+        Las temporadas reales y, si se piden más, las anteriores con formato 'AA-AA'
+        """
+        temporadas = list(self.temporadas)
+        primera = min(int(t[:2]) for t in temporadas)
+        while len(temporadas) < n:
+            primera -= 1
+            temporadas.append(f'{primera % 100:02d}-{(primera + 1) % 100:02d}')
+        return temporadas[:max(n, 1)]
+
+    def bloque(self, rng, n, competencias, temporadas, primer_id):
+        """
+        DataFrame de n filas sintéticas; `competencias` es
+        [(nombre, índice de la competencia real de origen)]
+        """
+        pesos = self.proporciones[[origen for _, origen in competencias]]
+        elegidas = rng.choice(len(competencias), size=n, p=pesos / pesos.sum())
+        origen = np.array([o for _, o in competencias])[elegidas]
+
+        z = rng.standard_normal((n, len(self.numericas))) @ self.cholesky.T
+        u = _fda_normal(z)
+        valores = np.empty_like(u)
+        for c in np.unique(origen):
+            filas = np.flatnonzero(origen == c)
+            for j, reales in enumerate(self.cuantiles[c]):
+                rejilla = (np.arange(len(reales)) + 0.5) / len(reales)
+                valores[filas, j] = np.interp(u[filas, j], rejilla, reales)
+            nulos = self.nulos[c]
+            valores[filas] = np.where(nulos[rng.integers(len(nulos), size=len(filas))], np.nan, valores[filas])
+
+        datos = pd.DataFrame(valores, columns=self.numericas)
+        for columna in self.enteras:
+            datos[columna] = datos[columna].round()
+            if pd.api.types.is_integer_dtype(self.tipos[columna]):
+                datos[columna] = datos[columna].astype(self.tipos[columna])
+        for columna, original in self.espejos.items():
+            datos[columna] = datos[original]
+
+        ids = np.arange(primer_id, primer_id + n)
+        nombres = np.array([nombre for nombre, _ in competencias])[elegidas]
+        equipo = (rng.random(n) * self.equipos[origen]).astype(int) + 1
+        datos['playerId'] = _ids_alfanumericos(ids)
+        datos['jugador'] = [f'Portero Sintético {i}' for i in ids]
+        datos['Competencia'] = nombres
+        datos['TeamName'] = [f'{comp} - Equipo {e}' for comp, e in zip(nombres, equipo)]
+        datos['Temporada'] = np.array(temporadas)[rng.integers(len(temporadas), size=n)]
+        return datos[self.columnas]
+
+
+def _ids_alfanumericos(ids, longitud=25):
+    """
+    Identificadores en base 36 con la misma longitud que los playerId reales
+    """
+    digitos = np.empty((len(ids), longitud), dtype='<U1')
+    resto = np.asarray(ids, dtype=np.int64).copy()
+    for posicion in range(longitud - 1, -1, -1):
+        digitos[:, posicion] = _ALFABETO_ID[resto % 36]
+        resto //= 36
+    return [''.join(fila) for fila in digitos]
+
+
+def _escribir_bloque(f, bloque, enteras_como_float):
+    """
+    Añade el bloque al CSV abierto en binario con el escritor de pyarrow (mucho
+    más rápido que DataFrame.to_csv). Las columnas float con valores enteros se
+    escriben como '26.0', igual que el consolidado real, para que se lean como float.
+    """
+    bloque = bloque.copy()
+    for columna in enteras_como_float:
+        valores = bloque[columna].to_numpy()
+        texto = np.char.add(np.nan_to_num(valores).astype(np.int64).astype(str), '.0').astype(object)
+        texto[np.isnan(valores)] = None
+        bloque[columna] = texto
+    tabla = pa.Table.from_pandas(bloque, preserve_index=False)
+    pa_csv.write_csv(tabla, f, pa_csv.WriteOptions(include_header=False, quoting_style='needed'))
+
+
+def generar_consolidado(ruta_destino, filas, competencias=None, temporadas=None, semilla=0,
+                        ruta_origen=RUTA_CSV_REAL, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Escribe un consolidado sintético de `filas` filas en `ruta_destino` (por bloques,
+    de forma atómica). Por defecto el número de competencias crece con las filas
+    para mantener el tamaño medio de competencia del consolidado real.
+    """
+    rng = np.random.default_rng(semilla)
+    modelo = ModeloConsolidado.ajustar(pd.read_csv(ruta_origen))
+
+    n_reales = len(modelo.competencias)
+    if competencias is None:
+        competencias = max(n_reales, filas // FILAS_POR_COMPETENCIA)
+    if temporadas is None:
+        temporadas = len(modelo.temporadas)
+    # Las primeras son las reales; el resto, copias numeradas de una competencia real
+    lista_competencias = [
+        (modelo.competencias[i % n_reales] + ('' if i < n_reales else f' {i // n_reales + 1}'), i % n_reales)
+        for i in range(competencias)
+    ]
+    lista_temporadas = modelo.temporadas_sinteticas(temporadas)
+
+    ruta_destino = Path(ruta_destino)
+    temporal = ruta_destino.with_name(ruta_destino.name + '.tmp')
+    try:
+        enteras_como_float = [
+            col for col in modelo.columnas
+            if col in modelo.tipos and pd.api.types.is_float_dtype(modelo.tipos[col])
+            and modelo.espejos.get(col, col) in modelo.enteras
+        ]
+        with open(temporal, 'wb') as f:
+            f.write((','.join(modelo.columnas) + '\n').encode('utf-8'))
+            for inicio in range(0, filas, filas_por_bloque):
+                n = min(filas_por_bloque, filas - inicio)
+                bloque = modelo.bloque(rng, n, lista_competencias, lista_temporadas, inicio)
+                _escribir_bloque(f, bloque, enteras_como_float)
+        os.replace(temporal, ruta_destino)
+    finally:
+        if temporal.exists():
+            temporal.unlink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--filas', type=int, required=True)
+    parser.add_argument('--salida', type=Path, required=True)
+    parser.add_argument('--competencias', type=int,
+                        help=f'por defecto una cada {FILAS_POR_COMPETENCIA} filas (como mínimo las reales)')
+    parser.add_argument('--temporadas', type=int, help='por defecto las reales')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--origen', type=Path, default=RUTA_CSV_REAL)
+    parser.add_argument('--filas-por-bloque', type=int, default=FILAS_POR_BLOQUE)
+    args = parser.parse_args()
+
+    generar_consolidado(args.salida, args.filas, args.competencias, args.temporadas, args.semilla,
+                        args.origen, args.filas_por_bloque)
+    print(f'{args.filas} filas en {args.salida}')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,22 +2,22 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
-st.set_page_config(page_title="Búsqueda Porteros", page_icon="🔍", layout="wide")
+from scouting.catalogo import catalogo_metricas
+from scouting.datos import load_data, version_datos
+from scouting.filtros import csv_filtrado, indice_filtros, paginar
+from scouting.rendimiento import cerrar_pagina, fragmento, iniciar_pagina, medir
+from scouting.tabla import FORMATO_DECIMAL, FORMATO_ENTERO, FORMATO_PORCENTAJE, mostrar_tabla
 
-# Cargar datos
-@st.cache_data
-def load_data():
-    df = pd.read_csv('CONSOLIDADO_metricas_por_90.csv')
-    diccionario = pd.read_excel('diccionario_metricas_porteros.xlsx')
-    return df, diccionario
+st.set_page_config(page_title="Búsqueda Porteros", page_icon="🔍", layout="wide")
+iniciar_pagina("Búsqueda Porteros")
 
-df, diccionario = load_data()
+with medir('carga'):
+    version = version_datos()
+    df, _ = load_data(version)
+    catalogo = catalogo_metricas(version)
 
 st.title("🔍 Búsqueda de Porteros")
 
-# Crear diccionario de mapeo de nombres
-nombre_map = dict(zip(diccionario['metrica'], diccionario['nombre_limpio']))
-
 # Columnas base que siempre se muestran
 columnas_base = ['jugador', 'TeamName', 'Competencia', 'Temporada', 'age', 'height', 'weight', 'minutos_totales']
 
@@ -25,23 +25,15 @@ columnas_base = ['jugador', 'TeamName', 'Competencia', 'Temporada', 'age', 'heig
 st.sidebar.header("Filtros")
 
 # Filtro de categorías de métricas
-categorias_disponibles = sorted(diccionario['categoria'].dropna().unique())
+categorias_disponibles = sorted(catalogo.categorias)
 categorias_seleccionadas = st.sidebar.multiselect(
     "Categorías de Métricas",
     options=categorias_disponibles,
     default=[]
 )
 
-# Obtener métricas del diccionario según categorías seleccionadas
-if categorias_seleccionadas:
-    # Filtrar métricas por categorías seleccionadas
-    metricas_disponibles = [
-        col for col in diccionario[diccionario['categoria'].isin(categorias_seleccionadas)]['metrica'].tolist() 
-        if col in df.columns
-    ]
-else:
-    # Si no hay categorías seleccionadas, mostrar todas
-    metricas_disponibles = [col for col in diccionario['metrica'].tolist() if col in df.columns]
+# Métricas del diccionario según categorías seleccionadas (todas si no hay ninguna)
+metricas_disponibles = catalogo.disponibles(df.columns, categorias_seleccionadas)
 
 # Filtro de minutos totales
 min_minutos = 0
@@ -91,235 +83,140 @@ temporadas_seleccionadas = st.sidebar.multiselect(
     default=[]
 )
 
-# Aplicar filtros
-df_filtrado = df.copy()
-
-# Filtro de minutos
-df_filtrado = df_filtrado[
-    (df_filtrado['minutos_totales'] >= minutos_range[0]) & 
-    (df_filtrado['minutos_totales'] <= minutos_range[1])
-]
-
-# Filtro de edad
+# Aplicar filtros (una sola máscara sobre el índice de filtros)
+rangos = {'minutos_totales': minutos_range}
 if 'age' in df.columns:
-    df_filtrado = df_filtrado[
-        (df_filtrado['age'] >= edad_range[0]) & 
-        (df_filtrado['age'] <= edad_range[1])
-    ]
-
-# Filtro de altura
+    rangos['age'] = edad_range
 if 'height' in df.columns:
-    df_filtrado = df_filtrado[
-        (df_filtrado['height'] >= altura_range[0]) & 
-        (df_filtrado['height'] <= altura_range[1])
-    ]
-
-# Filtro de competencias (si hay selección)
-if competencias_seleccionadas:
-    df_filtrado = df_filtrado[df_filtrado['Competencia'].isin(competencias_seleccionadas)]
+    rangos['height'] = altura_range
 
-# Filtro de temporadas (si hay selección)
-if temporadas_seleccionadas:
-    df_filtrado = df_filtrado[df_filtrado['Temporada'].isin(temporadas_seleccionadas)]
+with medir('filtros'):
+    mascara = indice_filtros(version).mascara(
+        rangos=rangos,
+        categorias={'Competencia': competencias_seleccionadas, 'Temporada': temporadas_seleccionadas}
+    )
 
 # Guardar cantidad total filtrada
-total_filtrados = len(df_filtrado)
-
-# Ordenar por Goles Evitados de mayor a menor
-if 'goles_evitados' in df_filtrado.columns:
-    df_filtrado = df_filtrado.sort_values(by='goles_evitados', ascending=False)
-
-# Limitar a top 500 para rendimiento
-df_filtrado = df_filtrado.head(500)
-
-# Mostrar contador de resultados
-if total_filtrados > 500:
-    st.info(f"📊 Mostrando el Top 500 de {total_filtrados} porteros que cumplen los filtros (ordenado por Goles Evitados)")
-else:
-    st.info(f"📊 Mostrando {total_filtrados} porteros de {len(df)} totales")
-# Preparar dataframe para mostrar
-columnas_a_mostrar = columnas_base + metricas_disponibles
-df_display = df_filtrado[columnas_a_mostrar].copy()
-
-# Resetear índice para evitar problemas con índices duplicados
-df_display = df_display.reset_index(drop=True)
-
-# Renombrar columnas según diccionario
-rename_dict = {
-    'jugador': 'Jugador',
-    'TeamName': 'Equipo',
-    'Competencia': 'Competencia',
-    'Temporada': 'Temporada',
-    'age': 'Edad',
-    'height': 'Altura (cm)',
-    'weight': 'Peso (kg)',
-    'minutos_totales': 'Minutos Totales'
-}
-
-# Agregar nombres limpios de métricas - asegurándose de que no haya duplicados
-contador_nombres = {}
-for metrica in metricas_disponibles:
-    if metrica in nombre_map:
-        nombre_limpio = nombre_map[metrica]
-        # Contar cuántas veces aparece este nombre
-        if nombre_limpio not in contador_nombres:
-            contador_nombres[nombre_limpio] = 0
-        else:
-            contador_nombres[nombre_limpio] += 1
-            # Si es duplicado, agregar un sufijo numérico
-            nombre_limpio = f"{nombre_limpio} ({contador_nombres[nombre_limpio]})"
-        rename_dict[metrica] = nombre_limpio
-    else:
-        # Si no está en el diccionario, usar el nombre original
-        rename_dict[metrica] = metrica
-
-df_display = df_display.rename(columns=rename_dict)
-
-# Eliminar columnas duplicadas, manteniendo solo la primera aparición
-df_display = df_display.loc[:, ~df_display.columns.duplicated(keep='first')]
-
-# Formatear columnas de porcentaje (las que empiezan con pct_)
-def format_dataframe(df):
-    df_formatted = df.copy()
-    
-    for col in df_filtered.columns:
-        # Buscar la métrica original
-        metrica_original = None
-        for k, v in rename_dict.items():
-            if v == col:
-                metrica_original = k
-                break
-        
-        # Si es una columna de porcentaje, formatear, 'Edad', 'Altura (cm)', 'Peso (kg)'
-        if metrica_original and metrica_original.startswith('pct_'):
-            df_formatted[col] = df_formatted[col].apply(
-                lambda x: f"{x*100:.2f}%" if pd.notna(x) else ""
-            )
-    
-    return df_formatted
-
-# Aplicar gradiente de color
-def apply_gradient(df):
-    # Asegurarse de que el índice sea único
-    if not df.index.is_unique:
-        df = df.reset_index(drop=True)
-    
-    # Identificar columnas numéricas (excluyendo las ya formateadas como string)
-    numeric_cols = []
-    for col in df.columns:
-        if col not in ['Jugador', 'Equipo', 'Competencia', 'Temporada', 'Edad', 'Altura (cm)', 'Peso (kg)']:
-            # Buscar la métrica original
-            metrica_original = None
-            for k, v in rename_dict.items():
-                if v == col:
-                    metrica_original = k
-                    break
-            
-            # Solo agregar columnas numéricas que no estén ya formateadas como string
-            if metrica_original and not metrica_original.startswith('pct_'):
-                # Verificar si aún es numérico (antes del formateo a string)
-                try:
-                    # Como ya están formateadas como string, no aplicamos gradiente a estas
-                    # El gradiente solo funciona con valores numéricos
-                    pass
-                except:
-                    pass
-    
-    # Como las columnas están formateadas como string, no podemos aplicar gradiente
-    # Retornar el DataFrame sin estilo
-    return df
-
-# Crear copia para filtrado y aplicar formato
-df_filtered = df_display.copy()
-
-# Formatear todas las columnas numéricas a 2 decimales y porcentajes
-for col in df_filtered.columns:
-    # Buscar la métrica original
-    metrica_original = None
-    for k, v in rename_dict.items():
-        if v == col:
-            metrica_original = k
-            break
-    
-    # Si es una columna de porcentaje, formatear como porcentaje
-    if metrica_original and metrica_original.startswith('pct_'):
-        df_filtered[col] = df_filtered[col].apply(
-            lambda x: f"{x*100:.2f}%" if pd.notna(x) else ""
+total_filtrados = int(mascara.sum())
+
+
+@fragmento('tabla')
+def tabla_resultados(mascara, total_filtrados, metricas_disponibles):
+    """
+    Orden, paginación, tabla y descarga: cambiar de página u orden no vuelve a filtrar
+    """
+    # ORDENACIÓN Y PAGINACIÓN
+    columnas_orden = [col for col in ['minutos_totales', 'age', 'height', 'weight'] + metricas_disponibles
+                      if pd.api.types.is_numeric_dtype(df[col])]
+    etiquetas_orden = {'minutos_totales': 'Minutos Totales', 'age': 'Edad', 'height': 'Altura (cm)', 'weight': 'Peso (kg)'}
+
+    col_orden, col_sentido, col_tamano, col_pagina = st.columns([3, 2, 2, 2])
+    with col_orden:
+        columna_orden = st.selectbox(
+            "Ordenar por",
+            options=columnas_orden,
+            index=columnas_orden.index('goles_evitados') if 'goles_evitados' in columnas_orden else 0,
+            format_func=lambda col: etiquetas_orden.get(col, catalogo.nombre_de(col))
         )
-    # Si es una columna numérica (no pct_ y no descriptiva), formatear a 2 decimales
-    elif col not in ['Jugador', 'Equipo', 'Competencia', 'Temporada', 'Edad', 'Altura (cm)', 'Peso (kg)']:
-        if pd.api.types.is_numeric_dtype(df_filtered[col]):
-            df_filtered[col] = df_filtered[col].apply(
-                lambda x: f"{x:.2f}" if pd.notna(x) else ""
-            )
-
-# Aplicar gradiente (antes del formateo a string para que funcione)
-# Necesitamos aplicar el gradiente ANTES de formatear a strings
-def apply_gradient_and_format(df_display_orig, rename_dict):
-    # Primero aplicar gradiente a columnas numéricas sin formatear
-    df_for_gradient = df_display_orig.copy()
-    
-    # Identificar columnas numéricas para el gradiente
-    numeric_cols = []
-    for col in df_for_gradient.columns:
-        if col not in ['Jugador', 'Equipo', 'Competencia', 'Temporada', 'Edad', 'Altura (cm)', 'Peso (kg)']:
-            metrica_original = None
-            for k, v in rename_dict.items():
-                if v == col:
-                    metrica_original = k
-                    break
-            
-            if metrica_original and not metrica_original.startswith('pct_'):
-                if pd.api.types.is_numeric_dtype(df_for_gradient[col]):
-                    numeric_cols.append(col)
-    
-    # Aplicar el gradiente
-    if numeric_cols:
-        styled = df_for_gradient.style.background_gradient(
-            cmap='RdYlGn',
-            subset=numeric_cols
+    with col_sentido:
+        sentido = st.selectbox("Orden", options=["Descendente", "Ascendente"])
+    with col_tamano:
+        filas_por_pagina = st.selectbox("Filas por página", options=[25, 50, 100, 250, 1000], index=1)
+
+    n_paginas = max(1, -(-total_filtrados // filas_por_pagina))
+    # Si los filtros reducen el resultado, volver a una página válida
+    if st.session_state.get('pagina_busqueda', 1) > n_paginas:
+        st.session_state['pagina_busqueda'] = n_paginas
+    with col_pagina:
+        pagina = st.number_input("Página", min_value=1, max_value=n_paginas, step=1, key='pagina_busqueda')
+
+    # Solo se materializan las filas de la página actual
+    with medir('orden'):
+        filas_pagina, _ = paginar(version, mascara, columna_orden, sentido == "Descendente", pagina, filas_por_pagina)
+        df_filtrado = df.iloc[filas_pagina]
+
+    # Mostrar contador de resultados
+    nombre_orden = etiquetas_orden.get(columna_orden, catalogo.nombre_de(columna_orden))
+    if total_filtrados > 0:
+        inicio = (pagina - 1) * filas_por_pagina
+        st.info(
+            f"📊 Mostrando {inicio + 1}-{inicio + len(filas_pagina)} de {total_filtrados} porteros "
+            f"({len(df)} totales), ordenados por {nombre_orden}"
         )
     else:
-        styled = df_for_gradient.style
-    
-    # Ahora aplicar formato de 2 decimales y porcentajes
-    format_dict = {}
-    for col in df_for_gradient.columns:
-        metrica_original = None
-        for k, v in rename_dict.items():
-            if v == col:
-                metrica_original = k
-                break
-        
-        if metrica_original and metrica_original.startswith('pct_'):
-            format_dict[col] = lambda x: f"{x*100:.2f}%" if pd.notna(x) else ""
-        elif col not in ['Jugador', 'Equipo', 'Competencia', 'Temporada']:
-            if pd.api.types.is_numeric_dtype(df_for_gradient[col]):
-                format_dict[col] = "{:.2f}"
-    
-    styled = styled.format(format_dict, na_rep="")
-    return styled
-
-# Formatear edad, peso y altura como enteros
-for col in ['age', 'height', 'weight']:
-    if col in df_display.columns:
-        df_display[col] = df_display[col].apply(lambda x: int(x) if pd.notna(x) else x)
-
-styled_df = apply_gradient_and_format(df_display, rename_dict)
-
-# Mostrar tabla
-st.dataframe(
-    styled_df,
-    width='stretch',
-    height=600,
-    hide_index=True
-)
+        st.info(f"📊 Mostrando 0 porteros de {len(df)} totales")
 
-# Opción de descarga
-csv = df_filtrado.to_csv(index=False).encode('utf-8')
-st.download_button(
-    label="📥 Descargar datos filtrados (CSV)",
-    data=csv,
-    file_name="porteros_filtrados.csv",
-    mime="text/csv"
-)
+    # Preparar dataframe para mostrar
+    columnas_a_mostrar = columnas_base + metricas_disponibles
+    df_display = df_filtrado[columnas_a_mostrar].copy()
+
+    # Resetear índice para evitar problemas con índices duplicados
+    df_display = df_display.reset_index(drop=True)
+
+    # Renombrar columnas según diccionario
+    rename_dict = {
+        'jugador': 'Jugador',
+        'TeamName': 'Equipo',
+        'Competencia': 'Competencia',
+        'Temporada': 'Temporada',
+        'age': 'Edad',
+        'height': 'Altura (cm)',
+        'weight': 'Peso (kg)',
+        'minutos_totales': 'Minutos Totales'
+    }
+
+    # Agregar nombres limpios de métricas - asegurándose de que no haya duplicados
+    rename_dict.update(catalogo.etiquetas(metricas_disponibles))
+
+    df_display = df_display.rename(columns=rename_dict)
+
+    # Eliminar columnas duplicadas, manteniendo solo la primera aparición
+    df_display = df_display.loc[:, ~df_display.columns.duplicated(keep='first')]
+
+    # Métrica original de cada columna mostrada (primera coincidencia de rename_dict)
+    metrica_original = {}
+    for k, v in rename_dict.items():
+        metrica_original.setdefault(v, k)
+
+    columnas_texto = ['Jugador', 'Equipo', 'Competencia', 'Temporada']
+    columnas_enteras = ['Edad', 'Altura (cm)', 'Peso (kg)']
+
+    # Columnas de porcentaje según el catálogo: se envían en escala 0-100
+    columnas_pct = [col for col in df_display.columns if catalogo.es_porcentaje(metrica_original.get(col))]
+    df_display[columnas_pct] = df_display[columnas_pct] * 100
+
+    # Formato por columna: porcentajes, enteros y el resto numérico a 2 decimales
+    formatos = {}
+    columnas_gradiente = []
+    for col in df_display.columns:
+        if col in columnas_texto or not pd.api.types.is_numeric_dtype(df_display[col]):
+            continue
+        if col in columnas_pct:
+            formatos[col] = FORMATO_PORCENTAJE
+        elif col in columnas_enteras:
+            formatos[col] = FORMATO_ENTERO
+        else:
+            formatos[col] = FORMATO_DECIMAL
+            # Barras de color solo en métricas numéricas que no son porcentaje
+            if col in metrica_original:
+                columnas_gradiente.append(col)
+
+    # Mostrar tabla
+    mostrar_tabla(df_display, formatos, columnas_gradiente, height=600)
+
+    # Opción de descarga (todas las filas filtradas, en el orden elegido): el CSV
+    # solo se genera al pedirlo, no en cada cambio de página u orden
+    if st.button("📄 Preparar descarga (CSV)"):
+        with medir('exportacion'):
+            csv = csv_filtrado(version, mascara, columna_orden, sentido == "Descendente")
+        st.download_button(
+            label=f"📥 Descargar {total_filtrados} porteros filtrados (CSV)",
+            data=csv,
+            file_name="porteros_filtrados.csv",
+            mime="text/csv"
+        )
+
+
+tabla_resultados(mascara, total_filtrados, metricas_disponibles)
+
+cerrar_pagina()
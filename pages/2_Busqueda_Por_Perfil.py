@@ -2,112 +2,19 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
-st.set_page_config(page_title="Búsqueda Por Perfil", page_icon="🎯", layout="wide")
+from scouting.catalogo import catalogo_metricas
+from scouting.datos import load_data, load_ponderacion_competencias, version_datos
+from scouting.filtros import selector_minutos_minimos
+from scouting.ponderaciones import PRESET_DICCIONARIO, cargar_presets, guardar_preset
+from scouting.rendimiento import cerrar_pagina, iniciar_pagina, medir
+from scouting.scores import ScoresPersonalizados, calcular_scores, indice_filtros_scores, indice_scores, scores_personalizados, scores_pool
+from scouting.tabla import FORMATO_DECIMAL, FORMATO_ENTERO, mostrar_tabla
 
-# Cargar datos
-@st.cache_data
-def load_data():
-    df = pd.read_csv('CONSOLIDADO_metricas_por_90.csv')
-    diccionario = pd.read_excel('diccionario_metricas_porteros.xlsx')
-    return df, diccionario
-
-@st.cache_data
-def calcular_scores(df, diccionario):
-    """
-    Calcula scores por categoría y global usando percentiles ponderados
-    """
-    # Cargar ponderaciones por competencia
-    try:
-        df_pond_comp = pd.read_excel('ponderacion_competencias.xlsx')
-        pond_comp_dict = dict(zip(df_pond_comp['Competencia'], df_pond_comp['Ponderacion_Competencia']))
-    except:
-        pond_comp_dict = {}
-    
-    df_scores = df[['jugador', 'TeamName', 'Competencia', 'Temporada', 'age', 'height', 'weight', 'minutos_totales']].copy()
-    
-    # Filtrar solo jugadores con mínimo 450 minutos
-    df_trabajo = df[df['minutos_totales'] >= 450].copy()
-    
-    # Obtener categorías (excluyendo 'Otras')
-    categorias = [cat for cat in diccionario['categoria'].dropna().unique() if cat.lower() != 'otras']
-    
-    # Diccionario para almacenar scores por categoría
-    scores_por_categoria = {}
-    
-    for categoria in categorias:
-        # Filtrar métricas de esta categoría
-        metricas_cat = diccionario[diccionario['categoria'] == categoria]
-        
-        score_categoria = pd.Series(0.0, index=df_trabajo.index)
-        suma_ponderaciones = 0
-        
-        for _, row in metricas_cat.iterrows():
-            metrica = row['metrica']
-            ponderacion = row['Ponderacion'] if pd.notna(row['Ponderacion']) else 1
-            invertir = row['Invertir'] if pd.notna(row['Invertir']) else False
-            
-            # Verificar que la métrica existe en el dataframe
-            if metrica not in df_trabajo.columns:
-                continue
-            
-            # Obtener valores de la métrica
-            valores = df_trabajo[metrica].copy()
-            
-            # Skip si todos los valores son NaN
-            if valores.isna().all():
-                continue
-            
-            # Invertir si es necesario (mayor valor = peor)
-            if invertir:
-                valores = -valores
-            
-            # Calcular percentil (0-100), usando method='average' y manejando NaN
-            percentiles = valores.rank(pct=True, method='average', na_option='keep') * 100
-            
-            # Reemplazar NaN por 0 (jugadores sin datos en esta métrica obtienen score 0)
-            percentiles = percentiles.fillna(0)
-            
-            # Aplicar ponderación
-            score_categoria += percentiles * ponderacion
-            suma_ponderaciones += ponderacion
-        
-        # Normalizar por la suma de ponderaciones
-        if suma_ponderaciones > 0:
-            score_categoria = score_categoria / suma_ponderaciones
-        
-        # Aplicar ponderación por competencia
-        for idx in score_categoria.index:
-            competencia = df_trabajo.loc[idx, 'Competencia']
-            pond_comp = pond_comp_dict.get(competencia, 1)
-            score_categoria.loc[idx] = score_categoria.loc[idx] * pond_comp
-        
-        # Normalizar a rango 0-100 después de ponderar por competencia
-        max_score = score_categoria.max()
-        if max_score > 0:
-            score_categoria = (score_categoria / max_score) * 100
-        
-        scores_por_categoria[f'Score_{categoria.replace(" ", "_")}'] = score_categoria
-    
-    # Calcular score global (promedio de todos los scores de categoría)
-    if scores_por_categoria:
-        score_global = pd.DataFrame(scores_por_categoria).mean(axis=1)
-    else:
-        score_global = pd.Series(0.0, index=df_trabajo.index)
-    
-    scores_por_categoria['Score_Global'] = score_global
-    
-    # Agregar scores al dataframe original
-    for col_name, score_series in scores_por_categoria.items():
-        df_scores.loc[score_series.index, col_name] = score_series
-    
-    # Rellenar NaN con 0 para jugadores con menos de 450 minutos
-    score_columns = [col for col in df_scores.columns if col.startswith('Score_')]
-    df_scores[score_columns] = df_scores[score_columns].fillna(0)
-    
-    return df_scores
+st.set_page_config(page_title="Búsqueda Por Perfil", page_icon="🎯", layout="wide")
+iniciar_pagina("Búsqueda Por Perfil")
 
-df, diccionario = load_data()
-df_scores = calcular_scores(df, diccionario)
+with medir('carga'):
+    version = version_datos()
 
 st.title("🎯 Búsqueda Por Perfil")
 
@@ -119,15 +26,26 @@ Los scores se basan en percentiles ponderados de las métricas de cada categorí
 # FILTROS
 st.sidebar.header("Filtros")
 
+# Umbral del pool de scores: las filas por debajo no puntúan, así que también es el mínimo del filtro de minutos
+minutos_minimos = selector_minutos_minimos(version)
+
+with medir('carga'):
+    df_scores = calcular_scores(version, minutos_minimos)
+
 # Filtro de minutos totales
-min_minutos = 450
 max_minutos = int(df_scores['minutos_totales'].max())
-minutos_range = st.sidebar.slider(
-    "Minutos Totales Jugados",
-    min_value=min_minutos,
-    max_value=max_minutos,
-    value=(min_minutos, max_minutos)
-)
+min_minutos = min(minutos_minimos, max_minutos)
+if min_minutos < max_minutos:
+    minutos_range = st.sidebar.slider(
+        "Minutos Totales Jugados",
+        min_value=min_minutos,
+        max_value=max_minutos,
+        value=(min_minutos, max_minutos)
+    )
+else:
+    # Umbral en el máximo del consolidado: no queda rango que elegir
+    st.sidebar.info(f"Solo entran porteros con {max_minutos} minutos")
+    minutos_range = (min_minutos, max_minutos)
 
 # Filtro de edad
 if 'age' in df_scores.columns:
@@ -170,6 +88,13 @@ temporadas_seleccionadas = st.sidebar.multiselect(
 st.sidebar.markdown("---")
 st.sidebar.subheader("Filtros de Score")
 
+# Por defecto los scores se calculan contra todo el pool de minutos mínimos
+scores_relativos = st.sidebar.checkbox(
+    "Scores relativos al pool filtrado",
+    value=False,
+    help="Recalcula percentiles y scores solo entre los porteros que cumplen los filtros de minutos, edad, altura, competencias y temporadas"
+)
+
 # Filtro de Score Global
 score_global_range = st.sidebar.slider(
     "Score Global",
@@ -193,65 +118,107 @@ for score_col in score_columns:
         step=1.0
     )
 
-# Aplicar filtros
-df_filtrado = df_scores.copy()
+# PONDERACIONES DE LA SESIÓN
+st.sidebar.markdown("---")
+st.sidebar.subheader("⚖️ Ponderaciones")
+
+with medir('carga'):
+    df, _ = load_data(version)
+    catalogo = catalogo_metricas(version)
+    metricas_score = catalogo.disponibles(df.columns, catalogo.categorias_score)
+
+# Ponderaciones del diccionario y del fichero de competencias
+ponderaciones_diccionario = {metrica: catalogo.ponderacion[metrica] for metrica in metricas_score}
+pond_comp_fichero = load_ponderacion_competencias(version)
+pond_comp_diccionario = {comp: float(pond_comp_fichero.get(comp, 1)) for comp in competencias_disponibles}
+
+presets = cargar_presets()
+preset = st.sidebar.selectbox("Preset", options=[PRESET_DICCIONARIO] + sorted(presets))
+
+# Punto de partida del editor: el diccionario, sobrescrito por el preset elegido
+ponderaciones_base = dict(ponderaciones_diccionario)
+pond_comp_base = dict(pond_comp_diccionario)
+if preset != PRESET_DICCIONARIO:
+    ponderaciones_base.update({m: p for m, p in presets[preset].get('metricas', {}).items() if m in ponderaciones_base})
+    pond_comp_base.update({c: p for c, p in presets[preset].get('competencias', {}).items() if c in pond_comp_base})
+
+columna_ponderacion = st.column_config.NumberColumn("Ponderación", min_value=0.0, step=0.5, format="%.1f")
+
+with st.sidebar.expander("Métricas por categoría"):
+    # La clave incluye el preset para que al cambiarlo el editor parta de sus valores
+    editor_metricas = st.data_editor(
+        pd.DataFrame({
+            'Categoría': [catalogo.categoria[m] for m in metricas_score],
+            'Métrica': [catalogo.nombre_de(m) for m in metricas_score],
+            'Ponderación': [ponderaciones_base[m] for m in metricas_score],
+        }),
+        key=f'editor_metricas_{preset}',
+        hide_index=True,
+        disabled=['Categoría', 'Métrica'],
+        column_config={'Ponderación': columna_ponderacion}
+    )
 
-# Filtro de minutos
-df_filtrado = df_filtrado[
-    (df_filtrado['minutos_totales'] >= minutos_range[0]) & 
-    (df_filtrado['minutos_totales'] <= minutos_range[1])
-]
+with st.sidebar.expander("Competencias"):
+    editor_competencias = st.data_editor(
+        pd.DataFrame({
+            'Competencia': competencias_disponibles,
+            'Ponderación': [pond_comp_base[c] for c in competencias_disponibles],
+        }),
+        key=f'editor_competencias_{preset}',
+        hide_index=True,
+        disabled=['Competencia'],
+        column_config={'Ponderación': columna_ponderacion}
+    )
 
-# Filtro de edad
-if 'age' in df_filtrado.columns:
-    df_filtrado = df_filtrado[
-        (df_filtrado['age'] >= edad_range[0]) & 
-        (df_filtrado['age'] <= edad_range[1])
-    ]
-
-# Filtro de altura (incluir nulos si no se modificó el rango)
-if 'height' in df_filtrado.columns:
-    # Si el rango es el completo, incluir nulos
-    if altura_range[0] == min_altura and altura_range[1] == max_altura:
-        df_filtrado = df_filtrado[
-            (df_filtrado['height'].isna()) |
-            ((df_filtrado['height'] >= altura_range[0]) & 
-             (df_filtrado['height'] <= altura_range[1]))
-        ]
-    else:
-        # Si se modificó el rango, solo filtrar los que tienen altura
-        df_filtrado = df_filtrado[
-            (df_filtrado['height'] >= altura_range[0]) & 
-            (df_filtrado['height'] <= altura_range[1])
-        ]
+ponderaciones = dict(zip(metricas_score, editor_metricas['Ponderación'].fillna(0).astype(float)))
+pond_competencias = dict(zip(competencias_disponibles, editor_competencias['Ponderación'].fillna(0).astype(float)))
 
-# Filtro de competencias
-if competencias_seleccionadas:
-    df_filtrado = df_filtrado[df_filtrado['Competencia'].isin(competencias_seleccionadas)]
+# Guardar las ponderaciones actuales como preset
+nombre_preset = st.sidebar.text_input("Guardar como preset", placeholder="p. ej. Portero líbero").strip()
+if st.sidebar.button("💾 Guardar preset", disabled=not nombre_preset or nombre_preset == PRESET_DICCIONARIO):
+    guardar_preset(nombre_preset, ponderaciones, pond_competencias)
+    st.sidebar.success(f"Preset '{nombre_preset}' guardado")
 
-# Filtro de temporadas
-if temporadas_seleccionadas:
-    df_filtrado = df_filtrado[df_filtrado['Temporada'].isin(temporadas_seleccionadas)]
+# Filtros del pool (todos menos los de score)
+rangos = {'minutos_totales': minutos_range}
+if 'age' in df_scores.columns:
+    rangos['age'] = edad_range
+if 'height' in df_scores.columns:
+    rangos['height'] = altura_range
+categorias = {'Competencia': competencias_seleccionadas, 'Temporada': temporadas_seleccionadas}
+
+# Filtro de altura: incluir nulos si no se modificó el rango
+incluir_nulos = []
+if 'height' in df_scores.columns and altura_range[0] == min_altura and altura_range[1] == max_altura:
+    incluir_nulos.append('height')
+
+with medir('scores'):
+    personalizadas = ponderaciones != ponderaciones_diccionario or pond_competencias != pond_comp_diccionario
+    if scores_relativos:
+        # Percentiles solo entre las filas del pool sobre el orden por métrica cacheado (LRU por pool y ponderaciones)
+        df_scores = scores_pool(version, rangos, categorias, incluir_nulos, ponderaciones, pond_competencias)
+        indice = indice_scores(df_scores)
+        st.caption("🎯 Scores calculados contra el pool filtrado" + (" con las ponderaciones de la sesión" if personalizadas else ""))
+    elif personalizadas:
+        # Con ponderaciones propias se re-puntúa sobre los percentiles cacheados (sin re-ranking);
+        # solo las filas filtradas se unen a las columnas base
+        indice = scores_personalizados(version, ponderaciones, pond_competencias, minutos_minimos)
+        st.caption("⚖️ Scores calculados con las ponderaciones de la sesión")
+    else:
+        indice = indice_filtros_scores(version, minutos_minimos)
 
-# Filtro de Score Global
-df_filtrado = df_filtrado[
-    (df_filtrado['Score_Global'] >= score_global_range[0]) & 
-    (df_filtrado['Score_Global'] <= score_global_range[1])
-]
+# Filtros de Score global y por categoría
+rangos_score = dict(rangos, Score_Global=score_global_range, **score_filters)
 
-# Filtros de Score por Categoría
-for score_col, (min_val, max_val) in score_filters.items():
-    df_filtrado = df_filtrado[
-        (df_filtrado[score_col] >= min_val) & 
-        (df_filtrado[score_col] <= max_val)
-    ]
+with medir('filtros'):
+    filas = indice.filas(rangos=rangos_score, categorias=categorias, incluir_nulos=incluir_nulos)
+    df_filtrado = indice.tabla(filas) if isinstance(indice, ScoresPersonalizados) else df_scores.iloc[filas]
 
 # Mostrar contador de resultados
 st.info(f"📊 Mostrando {len(df_filtrado)} porteros de {len(df_scores)} totales")
 
 # Preparar dataframe para mostrar
-df_display = df_filtrado.copy()
-df_display = df_display.reset_index(drop=True)
+df_display = df_filtrado.reset_index(drop=True)
 
 # Renombrar columnas
 rename_dict = {
@@ -274,66 +241,35 @@ for col in df_display.columns:
 
 df_display = df_display.rename(columns=rename_dict)
 
-# Función para aplicar gradiente y formato
-def apply_gradient_and_format_scores(df_display_orig, rename_dict):
-    df_for_gradient = df_display_orig.copy()
-    
-    # Identificar columnas de score para gradiente
-    score_cols = [col for col in df_for_gradient.columns if col.startswith('Score')]
-    
-    # Aplicar gradiente a columnas de score
-    if score_cols:
-        styled = df_for_gradient.style.background_gradient(
-            cmap='RdYlGn',
-            subset=score_cols,
-            vmin=0,
-            vmax=100
-        )
-    else:
-        styled = df_for_gradient.style
-    
-    # Formatear scores a 2 decimales
-    format_dict = {}
-    for col in score_cols:
-        format_dict[col] = "{:.2f}"
-    
-    styled = styled.format(format_dict, na_rep="")
-    return styled
-
-# Formatear edad, peso y altura como enteros antes de renombrar
-for col in ['Edad', 'Altura (cm)', 'Peso (kg)']:
-    if col in df_display.columns:
-        df_display[col] = df_display[col].apply(lambda x: int(x) if pd.notna(x) else x)
-
-styled_df = apply_gradient_and_format_scores(df_display, rename_dict)
+# Formato por columna: scores a 2 decimales con barras de color 0-100, edad, altura y peso como enteros
+columnas_score = [col for col in df_display.columns if col.startswith('Score')]
+formatos = {col: FORMATO_DECIMAL for col in columnas_score}
+formatos.update({col: FORMATO_ENTERO for col in ['Edad', 'Altura (cm)', 'Peso (kg)', 'Minutos Totales']})
 
 # Mostrar tabla
-st.dataframe(
-    styled_df,
-    width='stretch',
-    height=600,
-    hide_index=True
-)
-
-# Opción de descarga
-csv = df_filtrado.to_csv(index=False).encode('utf-8')
-st.download_button(
-    label="📥 Descargar datos filtrados (CSV)",
-    data=csv,
-    file_name="porteros_scores_filtrados.csv",
-    mime="text/csv"
-)
+mostrar_tabla(df_display, formatos, columnas_score, height=600, vmin=0, vmax=100)
+
+# Opción de descarga: el CSV solo se genera al pedirlo, no en cada cambio de filtro
+if st.button("📄 Preparar descarga (CSV)"):
+    with medir('exportacion'):
+        csv = df_filtrado.to_csv(index=False).encode('utf-8')
+    st.download_button(
+        label=f"📥 Descargar {len(df_filtrado)} porteros filtrados (CSV)",
+        data=csv,
+        file_name="porteros_scores_filtrados.csv",
+        mime="text/csv"
+    )
 
 # Sección de ayuda: Variables por categoría
 st.markdown("---")
 st.markdown("### 📋 Variables por Categoría")
 st.markdown("A continuación se detallan las métricas que componen cada perfil/categoría:")
 
-# Agrupar métricas por categoría
-categorias_info = diccionario[diccionario['categoria'].notna()].groupby('categoria')['nombre_limpio'].apply(list).to_dict()
-
-# Filtrar categorías (excluir "Otras" si existe)
-categorias_mostrar = {k: v for k, v in categorias_info.items() if k.lower() != 'otras'}
+# Métricas de cada categoría (excluyendo "Otras"), en orden alfabético de categoría
+categorias_mostrar = {
+    categoria: [catalogo.nombre_de(metrica) for metrica in catalogo.metricas_categoria[categoria]]
+    for categoria in sorted(catalogo.categorias_score)
+}
 
 # Mostrar en columnas para mejor visualización
 cols_per_row = 2
@@ -353,3 +289,5 @@ for i in range(num_rows):
                 metricas = categorias_mostrar[categoria]
                 for metrica in metricas:
                     st.markdown(f"- {metrica}")
+
+cerrar_pagina()
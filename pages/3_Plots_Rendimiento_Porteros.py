@@ -1,27 +1,29 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
 
-st.set_page_config(page_title="Plots Rendimiento", page_icon="📊", layout="wide")
+from scouting.catalogo import catalogo_metricas
+from scouting.datos import load_data, version_datos
+from scouting.dispersion import LIMITE_NOMBRES, MAX_PUNTOS_DISPERSION, UMBRAL_WEBGL, muestreo_por_densidad
+from scouting.filtros import indice_filtros, minutos_minimos_sesion
+from scouting.jugadores import indice_jugadores
+from scouting.rendimiento import cerrar_pagina, fragmento, iniciar_pagina, medir
 
-# Cargar datos
-@st.cache_data
-def load_data():
-    df = pd.read_csv('CONSOLIDADO_metricas_por_90.csv')
-    diccionario = pd.read_excel('diccionario_metricas_porteros.xlsx')
-    return df, diccionario
+st.set_page_config(page_title="Plots Rendimiento", page_icon="📊", layout="wide")
+iniciar_pagina("Plots Rendimiento Porteros")
 
-df, diccionario = load_data()
+with medir('carga'):
+    version = version_datos()
+    df, _ = load_data(version)
+    # Catálogo compilado del diccionario de métricas
+    catalogo = catalogo_metricas(version)
+    # Claves y textos de hover de cada fila, calculados una vez por versión
+    jugadores = indice_jugadores(version)
 
 st.title("📊 Plots de Rendimiento de Porteros")
 
-# Crear diccionario de mapeo de nombres
-nombre_map = dict(zip(diccionario['metrica'], diccionario['nombre_limpio']))
-nombre_map_inverso = dict(zip(diccionario['nombre_limpio'], diccionario['metrica']))
-
 # Obtener métricas numéricas del diccionario
-metricas_disponibles = [col for col in diccionario['metrica'].tolist() if col in df.columns]
+metricas_disponibles = catalogo.disponibles(df.columns)
 
 # Filtrar solo métricas numéricas positivas para tamaño y color
 metricas_numericas_positivas = []
@@ -32,8 +34,185 @@ for metrica in metricas_disponibles:
             metricas_numericas_positivas.append(metrica)
 
 # Nombres bonitos para las métricas
-nombres_bonitos_todas = [nombre_map.get(m, m) for m in metricas_disponibles]
-nombres_bonitos_positivas = [nombre_map.get(m, m) for m in metricas_numericas_positivas]
+nombres_bonitos_todas = [catalogo.nombre_de(m) for m in metricas_disponibles]
+nombres_bonitos_positivas = [catalogo.nombre_de(m) for m in metricas_numericas_positivas]
+
+
+@fragmento('dispersion')
+def dispersion(df_filtrado, variable_x, variable_x_nombre, variable_y, variable_y_nombre):
+    """
+    Burbujas del scatter y tabla de datos: cambiar tamaño, color o nombres solo re-ejecuta esta función
+    """
+    col_size, col_color, col_nombres = st.columns([2, 2, 1])
+
+    # Variable Tamaño
+    with col_size:
+        variable_size_nombre = st.selectbox(
+            "Variable Tamaño Burbuja",
+            options=["Ninguna"] + nombres_bonitos_positivas,
+            index=0
+        )
+    variable_size = None if variable_size_nombre == "Ninguna" else catalogo.metrica_de(variable_size_nombre)
+
+    # Variable Color
+    with col_color:
+        variable_color_nombre = st.selectbox(
+            "Variable Color Burbuja",
+            options=["Ninguna"] + nombres_bonitos_positivas,
+            index=0
+        )
+    variable_color = None if variable_color_nombre == "Ninguna" else catalogo.metrica_de(variable_color_nombre)
+
+    # Switch para mostrar nombres en el gráfico
+    with col_nombres:
+        mostrar_nombres = st.checkbox("Mostrar nombres de jugadores en gráfico", value=False)
+
+    # Validar variables de tamaño y color para NaN
+    if variable_size:
+        if df_filtrado[variable_size].isna().any():
+            st.warning(f"⚠️ La variable '{variable_size_nombre}' contiene valores vacíos y no puede usarse para el tamaño de burbuja. Por favor selecciona otra variable.")
+            variable_size = None
+            variable_size_nombre = "Ninguna"
+
+    if variable_color:
+        if df_filtrado[variable_color].isna().any():
+            st.warning(f"⚠️ La variable '{variable_color_nombre}' contiene valores vacíos y no puede usarse para el color de burbuja. Por favor selecciona otra variable.")
+            variable_color = None
+            variable_color_nombre = "Ninguna"
+
+    with medir('muestreo'):
+        # Posiciones en el consolidado: hover y claves precalculados por versión
+        posiciones = df_filtrado.index.to_numpy()
+        x = df_filtrado[variable_x].to_numpy(dtype=float)
+        y = df_filtrado[variable_y].to_numpy(dtype=float)
+        en_ventana = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+
+    # Demasiados puntos para el navegador: ejes acotables para verlos todos en una zona
+    if len(en_ventana) > MAX_PUNTOS_DISPERSION:
+        st.caption(
+            f"Hay {len(en_ventana):,} puntos: se dibuja una muestra que conserva la densidad de la nube. "
+            "Acota los ejes para ver todos los puntos de una zona."
+        )
+        col_zoom_x, col_zoom_y = st.columns(2)
+        for columna, valores, nombre in ((col_zoom_x, x, variable_x_nombre), (col_zoom_y, y, variable_y_nombre)):
+            minimo, maximo = float(valores[en_ventana].min()), float(valores[en_ventana].max())
+            if minimo < maximo:
+                with columna:
+                    desde, hasta = st.slider(f"Zoom {nombre}", min_value=minimo, max_value=maximo, value=(minimo, maximo))
+                en_ventana = en_ventana[(valores[en_ventana] >= desde) & (valores[en_ventana] <= hasta)]
+
+    with medir('muestreo'):
+        dibujadas = en_ventana[muestreo_por_densidad(
+            x[en_ventana], y[en_ventana], MAX_PUNTOS_DISPERSION, jugadores.claves[posiciones[en_ventana]]
+        )]
+        if len(dibujadas) < len(en_ventana):
+            st.caption(f"Mostrando {len(dibujadas):,} de {len(en_ventana):,} puntos")
+
+    with medir('figura'):
+        import plotly.graph_objects as go
+
+        # Solo las columnas numéricas que pide el hover, como customdata
+        extra = [(v, n) for v, n in ((variable_size, variable_size_nombre), (variable_color, variable_color_nombre)) if v]
+        hovertemplate = (
+            f"<b>%{{hovertext}}</b><br>{variable_x_nombre}: %{{x:.2f}}<br>{variable_y_nombre}: %{{y:.2f}}"
+            + ''.join(f"<br>{n}: %{{customdata[{i}]:.2f}}" for i, (_, n) in enumerate(extra))
+            + "<extra></extra>"
+        )
+
+        marker = dict(line=dict(width=0.5, color='DarkSlateGrey'), opacity=0.8)
+        if variable_size:
+            tamanos = df_filtrado[variable_size].to_numpy(dtype=float)
+            # Escala de área de plotly.express (size_max=20) sobre todos los filtrados, no solo la muestra
+            marker.update(
+                size=tamanos[dibujadas], sizemode='area',
+                sizeref=2.0 * max(tamanos.max(), 1e-9) / 20 ** 2
+            )
+        if variable_color:
+            colores = df_filtrado[variable_color].to_numpy(dtype=float)
+            marker.update(
+                color=colores[dibujadas], colorscale='Plasma', showscale=True,
+                cmin=colores.min(), cmax=colores.max(),
+                colorbar=dict(title=variable_color_nombre)
+            )
+
+        nombres = mostrar_nombres and len(dibujadas) <= LIMITE_NOMBRES
+        if mostrar_nombres and not nombres:
+            st.caption(f"Nombres ocultos: hay más de {LIMITE_NOMBRES:,} puntos en el gráfico")
+
+        # WebGL por encima del umbral: el navegador dibuja miles de puntos sin un nodo SVG por punto
+        traza = go.Scattergl if len(dibujadas) > UMBRAL_WEBGL else go.Scatter
+        fig = go.Figure(traza(
+            x=x[dibujadas],
+            y=y[dibujadas],
+            mode='markers+text' if nombres else 'markers',
+            text=df_filtrado['jugador'].to_numpy()[dibujadas] if nombres else None,
+            textposition='top center',
+            textfont=dict(size=9, color='white'),
+            hovertext=jugadores.hover[posiciones[dibujadas]],
+            customdata=np.column_stack([df_filtrado[v].to_numpy(dtype=float)[dibujadas] for v, _ in extra]) if extra else None,
+            hovertemplate=hovertemplate,
+            marker=marker,
+        ))
+
+        fig.update_layout(
+            title=f"{variable_y_nombre} vs {variable_x_nombre}",
+            height=700,
+            xaxis_title=variable_x_nombre,
+            yaxis_title=variable_y_nombre,
+            font=dict(size=12),
+            hovermode='closest'
+        )
+
+    # Mostrar el gráfico
+    with medir('serializacion'):
+        st.plotly_chart(fig, width='stretch')
+
+    # Tabla resumen debajo del gráfico
+    st.markdown("---")
+    st.subheader("Tabla de Datos")
+
+    # Preparar columnas para mostrar
+    columnas_mostrar = ['jugador', 'TeamName', 'Competencia', 'Temporada', 'minutos_totales']
+
+    # Agregar variables seleccionadas
+    if variable_x not in columnas_mostrar:
+        columnas_mostrar.append(variable_x)
+    if variable_y not in columnas_mostrar:
+        columnas_mostrar.append(variable_y)
+    if variable_size and variable_size not in columnas_mostrar:
+        columnas_mostrar.append(variable_size)
+    if variable_color and variable_color not in columnas_mostrar:
+        columnas_mostrar.append(variable_color)
+
+    df_tabla = df_filtrado[columnas_mostrar].copy()
+
+    # Renombrar columnas
+    rename_dict = {
+        'jugador': 'Jugador',
+        'TeamName': 'Equipo',
+        'Competencia': 'Competencia',
+        'Temporada': 'Temporada',
+        'minutos_totales': 'Minutos Totales'
+    }
+
+    for col in columnas_mostrar:
+        if col in catalogo.nombre and col not in rename_dict:
+            rename_dict[col] = catalogo.nombre[col]
+
+    df_tabla = df_tabla.rename(columns=rename_dict)
+
+    with medir('estilo'):
+        # Formatear columnas numéricas
+        for col in df_tabla.columns:
+            if pd.api.types.is_numeric_dtype(df_tabla[col]) and col not in ['Temporada']:
+                if col in ['Edad', 'Altura (cm)', 'Peso (kg)']:
+                    df_tabla[col] = df_tabla[col].apply(lambda x: f"{int(x)}" if pd.notna(x) else "")
+                else:
+                    df_tabla[col] = df_tabla[col].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "")
+
+    with medir('serializacion'):
+        st.dataframe(df_tabla, width='stretch', height=400, hide_index=True)
+
 
 # CONFIGURACIÓN DEL GRÁFICO
 st.sidebar.header("Configuración del Gráfico")
@@ -44,7 +223,7 @@ variable_x_nombre = st.sidebar.selectbox(
     options=nombres_bonitos_todas,
     index=0
 )
-variable_x = nombre_map_inverso.get(variable_x_nombre, variable_x_nombre)
+variable_x = catalogo.metrica_de(variable_x_nombre)
 
 # Variable Eje Y
 variable_y_nombre = st.sidebar.selectbox(
@@ -52,36 +231,17 @@ variable_y_nombre = st.sidebar.selectbox(
     options=nombres_bonitos_todas,
     index=min(1, len(nombres_bonitos_todas) - 1)
 )
-variable_y = nombre_map_inverso.get(variable_y_nombre, variable_y_nombre)
-
-# Variable Tamaño
-variable_size_nombre = st.sidebar.selectbox(
-    "Variable Tamaño Burbuja",
-    options=["Ninguna"] + nombres_bonitos_positivas,
-    index=0
-)
-variable_size = None if variable_size_nombre == "Ninguna" else nombre_map_inverso.get(variable_size_nombre, variable_size_nombre)
-
-# Variable Color
-variable_color_nombre = st.sidebar.selectbox(
-    "Variable Color Burbuja",
-    options=["Ninguna"] + nombres_bonitos_positivas,
-    index=0
-)
-variable_color = None if variable_color_nombre == "Ninguna" else nombre_map_inverso.get(variable_color_nombre, variable_color_nombre)
-
-# Switch para mostrar nombres en el gráfico
-mostrar_nombres = st.sidebar.checkbox("Mostrar nombres de jugadores en gráfico", value=False)
+variable_y = catalogo.metrica_de(variable_y_nombre)
 
 st.sidebar.markdown("---")
 st.sidebar.header("Filtros")
 
-# Filtro de minutos totales
-min_minutos = 450
+# Filtro de minutos totales (parte del umbral de minutos de la sesión)
 max_minutos = int(df['minutos_totales'].max())
+min_minutos = min(minutos_minimos_sesion(), max_minutos)
 minutos_range = st.sidebar.slider(
     "Minutos Totales Jugados",
-    min_value=min_minutos,
+    min_value=0,
     max_value=max_minutos,
     value=(min_minutos, max_minutos)
 )
@@ -124,176 +284,28 @@ temporadas_seleccionadas = st.sidebar.multiselect(
     default=[]
 )
 
-# Aplicar filtros
-df_filtrado = df.copy()
-
-# Filtro de minutos
-df_filtrado = df_filtrado[
-    (df_filtrado['minutos_totales'] >= minutos_range[0]) & 
-    (df_filtrado['minutos_totales'] <= minutos_range[1])
-]
-
-# Filtro de edad
+# Aplicar filtros (una sola máscara sobre el índice de filtros)
+rangos = {'minutos_totales': minutos_range}
 if 'age' in df.columns:
-    df_filtrado = df_filtrado[
-        (df_filtrado['age'] >= edad_range[0]) & 
-        (df_filtrado['age'] <= edad_range[1])
-    ]
-
-# Filtro de altura
+    rangos['age'] = edad_range
 if 'height' in df.columns:
-    df_filtrado = df_filtrado[
-        (df_filtrado['height'] >= altura_range[0]) & 
-        (df_filtrado['height'] <= altura_range[1])
-    ]
+    rangos['height'] = altura_range
 
-# Filtro de competencias
-if competencias_seleccionadas:
-    df_filtrado = df_filtrado[df_filtrado['Competencia'].isin(competencias_seleccionadas)]
-
-# Filtro de temporadas
-if temporadas_seleccionadas:
-    df_filtrado = df_filtrado[df_filtrado['Temporada'].isin(temporadas_seleccionadas)]
+with medir('filtros'):
+    filas = indice_filtros(version).filas(
+        rangos=rangos,
+        categorias={'Competencia': competencias_seleccionadas, 'Temporada': temporadas_seleccionadas}
+    )
+    df_filtrado = df.iloc[filas]
 
 # Mostrar contador de resultados
 st.info(f"📊 Mostrando {len(df_filtrado)} porteros de {len(df)} totales")
 
-# Validar variables de tamaño y color para NaN
-validacion_ok = True
-
-if variable_size:
-    if df_filtrado[variable_size].isna().any():
-        st.warning(f"⚠️ La variable '{variable_size_nombre}' contiene valores vacíos y no puede usarse para el tamaño de burbuja. Por favor selecciona otra variable.")
-        variable_size = None
-        variable_size_nombre = "Ninguna"
-        validacion_ok = False
-
-if variable_color:
-    if df_filtrado[variable_color].isna().any():
-        st.warning(f"⚠️ La variable '{variable_color_nombre}' contiene valores vacíos y no puede usarse para el color de burbuja. Por favor selecciona otra variable.")
-        variable_color = None
-        variable_color_nombre = "Ninguna"
-        validacion_ok = False
-
-# Preparar datos para el gráfico
-df_plot = df_filtrado.copy()
-
-# Crear columna de hover con información del portero
-df_plot['hover_info'] = (
-    df_plot['jugador'] + '<br>' +
-    df_plot['TeamName'] + '<br>' +
-    df_plot['Competencia'] + ' - ' + df_plot['Temporada'].astype(str)
-)
-
-# Crear el scatter plot
-fig = px.scatter(
-    df_plot,
-    x=variable_x,
-    y=variable_y,
-    size=variable_size if variable_size else None,
-    color=variable_color if variable_color else None,
-    color_continuous_scale='Plasma' if variable_color else None,
-    text='jugador' if mostrar_nombres else None,
-    hover_name='hover_info',
-    hover_data={
-        'jugador': True,
-        'TeamName': True,
-        'Competencia': True,
-        'Temporada': True,
-        'hover_info': False
-    },
-    labels={
-        variable_x: variable_x_nombre,
-        variable_y: variable_y_nombre,
-        variable_size: variable_size_nombre if variable_size else None,
-        variable_color: variable_color_nombre if variable_color else None
-    },
-    title=f"{variable_y_nombre} vs {variable_x_nombre}",
-    height=700
-)
-
-# Configurar marcadores y texto
-if mostrar_nombres:
-    fig.update_traces(
-        mode="markers+text",
-        textposition='top center',
-        textfont=dict(size=9, color='white'),
-        marker=dict(
-            line=dict(width=0.5, color='DarkSlateGrey'),
-            opacity=0.8
-        ),
-        selector=dict(type="scatter")
-    )
-else:
-    fig.update_traces(
-        marker=dict(
-            line=dict(width=0.5, color='DarkSlateGrey'),
-            opacity=0.8
-        ),
-        selector=dict(type="scatter")
-    )
-
-fig.update_layout(
-    xaxis_title=variable_x_nombre,
-    yaxis_title=variable_y_nombre,
-    font=dict(size=12),
-    hovermode='closest'
-)
-
-# Agregar nombres de colores si hay variable de color
-if variable_color:
-    fig.update_layout(
-        coloraxis_colorbar=dict(
-            title=variable_color_nombre
-        )
-    )
+# plotly.express se importa aquí (no al cargar la página) para que título y filtros se pinten antes
+with medir('importaciones'):
+    import plotly.express as px
 
-# Mostrar el gráfico
-st.plotly_chart(fig, width='stretch')
-
-# Tabla resumen debajo del gráfico
-st.markdown("---")
-st.subheader("Tabla de Datos")
-
-# Preparar columnas para mostrar
-columnas_mostrar = ['jugador', 'TeamName', 'Competencia', 'Temporada', 'minutos_totales']
-
-# Agregar variables seleccionadas
-if variable_x not in columnas_mostrar:
-    columnas_mostrar.append(variable_x)
-if variable_y not in columnas_mostrar:
-    columnas_mostrar.append(variable_y)
-if variable_size and variable_size not in columnas_mostrar:
-    columnas_mostrar.append(variable_size)
-if variable_color and variable_color not in columnas_mostrar:
-    columnas_mostrar.append(variable_color)
-
-df_tabla = df_filtrado[columnas_mostrar].copy()
-
-# Renombrar columnas
-rename_dict = {
-    'jugador': 'Jugador',
-    'TeamName': 'Equipo',
-    'Competencia': 'Competencia',
-    'Temporada': 'Temporada',
-    'minutos_totales': 'Minutos Totales'
-}
-
-for col in columnas_mostrar:
-    if col in nombre_map and col not in rename_dict:
-        rename_dict[col] = nombre_map[col]
-
-df_tabla = df_tabla.rename(columns=rename_dict)
-
-# Formatear columnas numéricas
-for col in df_tabla.columns:
-    if pd.api.types.is_numeric_dtype(df_tabla[col]) and col not in ['Temporada']:
-        if col in ['Edad', 'Altura (cm)', 'Peso (kg)']:
-            df_tabla[col] = df_tabla[col].apply(lambda x: f"{int(x)}" if pd.notna(x) else "")
-        else:
-            df_tabla[col] = df_tabla[col].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "")
-
-st.dataframe(df_tabla, width='stretch', height=400, hide_index=True)
+dispersion(df_filtrado, variable_x, variable_x_nombre, variable_y, variable_y_nombre)
 
 # Gráficos de barras horizontales
 st.markdown("---")
@@ -305,86 +317,83 @@ col1, col2 = st.columns(2)
 with col1:
     st.markdown(f"**Top 20 - {variable_x_nombre}**")
     
-    # Preparar datos ordenados y eliminar NaN
-    # Crear identificador único
-    df_bar_x = df_filtrado[['jugador', 'Temporada', 'TeamName', 'Competencia', variable_x]].copy()
-    df_bar_x['id_jugador'] = df_bar_x['jugador'] + ' - ' + df_bar_x['Temporada'].astype(str) + ' - ' + df_bar_x['TeamName']
-    df_bar_x = df_bar_x.dropna(subset=[variable_x])
-    df_bar_x = df_bar_x.sort_values(by=variable_x, ascending=True).tail(20)
-    
-    fig_bar_x = px.bar(
-        df_bar_x,
-        x=variable_x,
-        y='id_jugador',
-        orientation='h',
-        labels={
-            variable_x: variable_x_nombre,
-            'id_jugador': 'Jugador'
-        },
-        title=f"Top 20 - {variable_x_nombre}",
-        template="plotly_dark",
-        height=600,
-        color=variable_x,
-        color_continuous_scale='Plasma'
-    )
-    
-    fig_bar_x.update_layout(
-        showlegend=False,
-        yaxis={'categoryorder':'total ascending'}
-    )
-    
-    st.plotly_chart(fig_bar_x, width='stretch')
+    with medir('figura'):
+        # Preparar datos ordenados y eliminar NaN
+        # Crear identificador único
+        df_bar_x = df_filtrado[['jugador', 'Temporada', 'TeamName', 'Competencia', variable_x]].copy()
+        df_bar_x['id_jugador'] = df_bar_x['jugador'].astype(str) + ' - ' + df_bar_x['Temporada'].astype(str) + ' - ' + df_bar_x['TeamName'].astype(str)
+        df_bar_x = df_bar_x.dropna(subset=[variable_x])
+        df_bar_x = df_bar_x.sort_values(by=variable_x, ascending=True).tail(20)
+
+        fig_bar_x = px.bar(
+            df_bar_x,
+            x=variable_x,
+            y='id_jugador',
+            orientation='h',
+            labels={
+                variable_x: variable_x_nombre,
+                'id_jugador': 'Jugador'
+            },
+            title=f"Top 20 - {variable_x_nombre}",
+            template="plotly_dark",
+            height=600,
+            color=variable_x,
+            color_continuous_scale='Plasma'
+        )
+
+        fig_bar_x.update_layout(
+            showlegend=False,
+            yaxis={'categoryorder':'total ascending'}
+        )
+
+    with medir('serializacion'):
+        st.plotly_chart(fig_bar_x, width='stretch')
 
 # Gráfico de barras para Variable Y
 with col2:
     st.markdown(f"**Top 20 - {variable_y_nombre}**")
     
-    # Preparar datos ordenados y eliminar NaN
-    # Crear identificador único
-    df_bar_y = df_filtrado[['jugador', 'Temporada', 'TeamName', 'Competencia', variable_y]].copy()
-    df_bar_y['id_jugador'] = df_bar_y['jugador'] + ' - ' + df_bar_y['Temporada'].astype(str) + ' - ' + df_bar_y['TeamName']
-    df_bar_y = df_bar_y.dropna(subset=[variable_y])
-    df_bar_y = df_bar_y.sort_values(by=variable_y, ascending=True).tail(20)
-    
-    fig_bar_y = px.bar(
-        df_bar_y,
-        x=variable_y,
-        y='id_jugador',
-        orientation='h',
-        labels={
-            variable_y: variable_y_nombre,
-            'id_jugador': 'Jugador'
-        },
-        title=f"Top 20 - {variable_y_nombre}",
-        template="plotly_dark",
-        height=600,
-        color=variable_y,
-        color_continuous_scale='Plasma'
-    )
-    
-    fig_bar_y.update_layout(
-        showlegend=False,
-        yaxis={'categoryorder':'total ascending'}
-    )
-    
-    st.plotly_chart(fig_bar_y, width='stretch')
+    with medir('figura'):
+        # Preparar datos ordenados y eliminar NaN
+        # Crear identificador único
+        df_bar_y = df_filtrado[['jugador', 'Temporada', 'TeamName', 'Competencia', variable_y]].copy()
+        df_bar_y['id_jugador'] = df_bar_y['jugador'].astype(str) + ' - ' + df_bar_y['Temporada'].astype(str) + ' - ' + df_bar_y['TeamName'].astype(str)
+        df_bar_y = df_bar_y.dropna(subset=[variable_y])
+        df_bar_y = df_bar_y.sort_values(by=variable_y, ascending=True).tail(20)
+
+        fig_bar_y = px.bar(
+            df_bar_y,
+            x=variable_y,
+            y='id_jugador',
+            orientation='h',
+            labels={
+                variable_y: variable_y_nombre,
+                'id_jugador': 'Jugador'
+            },
+            title=f"Top 20 - {variable_y_nombre}",
+            template="plotly_dark",
+            height=600,
+            color=variable_y,
+            color_continuous_scale='Plasma'
+        )
 
-# Opción de descarga
-st.markdown("---")
-for col in df_tabla.columns:
-    if pd.api.types.is_numeric_dtype(df_tabla[col]) and col not in ['Temporada']:
-        if col in ['Edad', 'Altura (cm)', 'Peso (kg)']:
-            df_tabla[col] = df_tabla[col].apply(lambda x: f"{int(x)}" if pd.notna(x) else "")
-        else:
-            df_tabla[col] = df_tabla[col].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "")
+        fig_bar_y.update_layout(
+            showlegend=False,
+            yaxis={'categoryorder':'total ascending'}
+        )
 
-st.dataframe(df_tabla, width='stretch', height=400, hide_index=True)
+    with medir('serializacion'):
+        st.plotly_chart(fig_bar_y, width='stretch')
 
+st.markdown("---")
 # Opción de descarga
-csv = df_filtrado.to_csv(index=False).encode('utf-8')
+with medir('exportacion'):
+    csv = df_filtrado.to_csv(index=False).encode('utf-8')
 st.download_button(
     label="📥 Descargar datos filtrados (CSV)",
     data=csv,
     file_name="porteros_plot_filtrados.csv",
     mime="text/csv"
 )
+
+cerrar_pagina()
@@ -0,0 +1,209 @@
+import streamlit as st
+
+from scouting.datos import load_data, version_datos
+from scouting.filtros import indice_filtros, selector_minutos_minimos
+from scouting.jugadores import indice_jugadores
+from scouting.rendimiento import cerrar_pagina, fragmento, iniciar_pagina, medir
+from scouting.scores import calcular_scores
+from scouting.similares import DISTANCIA_COSENO, DISTANCIA_EUCLIDEA, indice_similitud
+from scouting.tabla import FORMATO_DECIMAL, FORMATO_ENTERO, mostrar_tabla
+
+st.set_page_config(page_title="Porteros Similares", page_icon="🔎", layout="wide")
+iniciar_pagina("Porteros Similares")
+
+with medir('carga'):
+    version = version_datos()
+
+# Umbral del pool de percentiles: los jugadores por debajo ni se comparan ni aparecen
+minutos_minimos = selector_minutos_minimos(version)
+
+with medir('carga'):
+    df, _ = load_data(version)
+    df_scores = calcular_scores(version, minutos_minimos)
+    indice = indice_similitud(version, minutos_minimos)
+    jugadores = indice_jugadores(version)
+
+st.title("🔎 Porteros Similares")
+
+st.markdown("""
+Encuentra los porteros con el perfil de percentiles más parecido al de un jugador de referencia,
+dentro de los filtros elegidos (más jóvenes, de otras ligas...).
+""")
+
+
+def etiqueta_jugador(fila):
+    return jugadores.etiquetas[fila]
+
+
+# JUGADOR DE REFERENCIA
+st.sidebar.header("Jugador de Referencia")
+# format_func se evalúa para cada opción en cada ejecución: las etiquetas ya están precalculadas
+with medir('opciones'):
+    clave_referencia = st.sidebar.selectbox(
+        "Buscar jugador",
+        options=jugadores.opciones(indice.filas),
+        format_func=jugadores.etiqueta
+    )
+    fila_referencia = jugadores.fila(clave_referencia)
+
+# CONFIGURACIÓN DE LA BÚSQUEDA
+st.sidebar.markdown("---")
+st.sidebar.header("Similitud")
+
+distancia = st.sidebar.radio(
+    "Distancia",
+    options=[DISTANCIA_COSENO, DISTANCIA_EUCLIDEA],
+    format_func=lambda d: "Coseno (forma del perfil)" if d == DISTANCIA_COSENO else "Euclídea (perfil y nivel)"
+)
+n_resultados = st.sidebar.slider("Número de resultados", min_value=5, max_value=50, value=10, step=5)
+
+with st.sidebar.expander("Peso de cada categoría"):
+    pesos_categoria = {
+        categoria: st.slider(categoria, min_value=0.0, max_value=3.0, value=1.0, step=0.25)
+        for categoria in indice.categorias
+    }
+
+# FILTROS (solo sobre los candidatos, no sobre el jugador de referencia)
+st.sidebar.markdown("---")
+st.sidebar.header("Filtros")
+
+# Filtro de minutos totales
+max_minutos = int(df['minutos_totales'].max())
+min_minutos = min(minutos_minimos, max_minutos)
+if min_minutos < max_minutos:
+    minutos_range = st.sidebar.slider(
+        "Minutos Totales Jugados",
+        min_value=min_minutos,
+        max_value=max_minutos,
+        value=(min_minutos, max_minutos)
+    )
+else:
+    # Umbral en el máximo del consolidado: no queda rango que elegir
+    st.sidebar.info(f"Solo entran porteros con {max_minutos} minutos")
+    minutos_range = (min_minutos, max_minutos)
+
+# Filtro de edad
+if 'age' in df.columns:
+    min_edad = int(df['age'].min())
+    max_edad = int(df['age'].max())
+    edad_range = st.sidebar.slider(
+        "Edad",
+        min_value=min_edad,
+        max_value=max_edad,
+        value=(min_edad, max_edad)
+    )
+
+# Filtro de altura
+if 'height' in df.columns:
+    min_altura = int(df['height'].dropna().min())
+    max_altura = int(df['height'].dropna().max())
+    altura_range = st.sidebar.slider(
+        "Altura (cm)",
+        min_value=min_altura,
+        max_value=max_altura,
+        value=(min_altura, max_altura)
+    )
+
+# Filtro de competencias
+competencias_disponibles = sorted(df['Competencia'].unique())
+competencias_seleccionadas = st.sidebar.multiselect(
+    "Competencias",
+    options=competencias_disponibles,
+    default=[]
+)
+
+# Filtro de temporadas
+temporadas_disponibles = sorted(df['Temporada'].unique(), reverse=True)
+temporadas_seleccionadas = st.sidebar.multiselect(
+    "Temporadas",
+    options=temporadas_disponibles,
+    default=[]
+)
+
+# Aplicar filtros (una sola máscara sobre el índice de filtros)
+rangos = {'minutos_totales': minutos_range}
+if 'age' in df.columns:
+    rangos['age'] = edad_range
+if 'height' in df.columns:
+    rangos['height'] = altura_range
+
+# Filtro de altura: incluir nulos si no se modificó el rango
+incluir_nulos = []
+if 'height' in df.columns and altura_range[0] == min_altura and altura_range[1] == max_altura:
+    incluir_nulos.append('height')
+
+with medir('filtros'):
+    mascara = indice_filtros(version).mascara(
+        rangos=rangos,
+        categorias={'Competencia': competencias_seleccionadas, 'Temporada': temporadas_seleccionadas},
+        incluir_nulos=incluir_nulos
+    )
+
+# BÚSQUEDA
+with medir('similitud'):
+    filas_similares, similitud = indice.vecinos(
+        fila_referencia, n_resultados, distancia, pesos_categoria, mascara
+    )
+
+
+@fragmento('comparar')
+def comparar_en_radar(fila_referencia, filas_similares):
+    """
+    Lleva el jugador de referencia y los más parecidos al radar de la Comparativa
+    (mover el slider no repite la búsqueda)
+    """
+    n_radar = min(4, len(filas_similares))
+    if len(filas_similares) > 1:
+        n_radar = st.slider(
+            "Jugadores a comparar en el radar",
+            min_value=1,
+            max_value=min(9, len(filas_similares)),
+            value=n_radar
+        )
+    if st.button("⚖️ Comparar en el radar"):
+        # Claves enteras de la Comparativa (las filas repetidas del consolidado comparten clave)
+        st.session_state['jugadores_comparativa'] = list(dict.fromkeys(
+            jugadores.clave(fila) for fila in [fila_referencia, *filas_similares[:n_radar]]
+        ))
+        st.switch_page("pages/4_Comparativa_Porteros.py")
+
+
+st.subheader(f"Más parecidos a {etiqueta_jugador(fila_referencia)}")
+
+if len(filas_similares) == 0:
+    st.info("No hay porteros que cumplan los filtros seleccionados.")
+else:
+    nombre_similitud = "Similitud (coseno)" if distancia == DISTANCIA_COSENO else "Distancia euclídea"
+    df_display = df_scores.iloc[filas_similares][
+        ['jugador', 'TeamName', 'Competencia', 'Temporada', 'age', 'height', 'minutos_totales', 'Score_Global']
+    ].reset_index(drop=True)
+    df_display.insert(0, nombre_similitud, similitud if distancia == DISTANCIA_COSENO else -similitud)
+    df_display = df_display.rename(columns={
+        'jugador': 'Jugador',
+        'TeamName': 'Equipo',
+        'age': 'Edad',
+        'height': 'Altura (cm)',
+        'minutos_totales': 'Minutos Totales',
+        'Score_Global': 'Score Global'
+    })
+
+    formatos = {
+        nombre_similitud: FORMATO_DECIMAL,
+        'Edad': FORMATO_ENTERO,
+        'Altura (cm)': FORMATO_ENTERO,
+        'Minutos Totales': FORMATO_ENTERO,
+        'Score Global': FORMATO_DECIMAL
+    }
+    mostrar_tabla(df_display, formatos, ['Score Global'], height=min(600, 38 * (len(df_display) + 1)), vmin=0, vmax=100)
+
+    comparar_en_radar(fila_referencia, filas_similares)
+
+# Métricas que entran en la comparación
+st.markdown("---")
+st.markdown("### 📋 Métricas consideradas")
+st.caption(
+    f"{len(indice.metricas)} métricas en percentiles globales (pool de {minutos_minimos}+ minutos). "
+    "Con coseno los perfiles se comparan respecto a la mediana (percentil 50)."
+)
+
+cerrar_pagina()
@@ -0,0 +1,95 @@
+import streamlit as st
+import pandas as pd
+
+from scouting import politica_cache
+from scouting.rendimiento import cerrar_pagina, contadores_cache, iniciar_pagina, medir
+
+st.set_page_config(page_title="Administración de Caché", page_icon="🗄️", layout="wide")
+iniciar_pagina("Administración de Caché")
+
+MB = 1024 * 1024
+
+st.title("🗄️ Administración de Caché")
+
+st.markdown("""
+Tamaño estimado y aciertos de cada caché en memoria de este proceso. Los límites
+(entradas máximas, TTL y presupuesto global) se definen en `scouting/politica_cache.py`;
+al superar el presupuesto se liberan las entradas usadas hace más tiempo.
+""")
+
+with medir('resumen'):
+    resumen = politica_cache.resumen()
+    contadores = contadores_cache()
+    memoria = sum(fila['memoria'] for fila in resumen)
+    rss = politica_cache.rss_proceso()
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Memoria estimada en caché", f"{memoria / MB:,.1f} MB")
+col2.metric("Presupuesto", f"{politica_cache.PRESUPUESTO_BYTES / MB:,.0f} MB")
+col3.metric("Memoria residente del proceso", f"{rss / MB:,.1f} MB" if rss is not None else "—")
+col4.metric("Entradas", sum(fila['entradas'] for fila in resumen))
+
+st.progress(min(memoria / politica_cache.PRESUPUESTO_BYTES, 1.0))
+
+st.subheader("Por función")
+filas = []
+for fila in resumen:
+    llamadas = contadores.get(fila['funcion'], {'llamadas': 0, 'fallos': 0})
+    filas.append({
+        'Función': fila['funcion'],
+        'Entradas': fila['entradas'],
+        'Máx. entradas': fila['max_entries'],
+        'TTL (s)': fila['ttl'],
+        'MB': fila['memoria'] / MB,
+        'MB memory-map': fila['mapeado'] / MB,
+        'Aciertos': llamadas['llamadas'] - llamadas['fallos'],
+        'Fallos': llamadas['fallos'],
+        'Liberadas por presupuesto': fila['expulsiones'],
+        'Liberable': fila['expulsable'],
+    })
+df_funciones = pd.DataFrame(filas)
+if not df_funciones.empty:
+    df_funciones = df_funciones.sort_values('MB', ascending=False)
+st.dataframe(
+    df_funciones,
+    hide_index=True,
+    width='stretch',
+    column_config={
+        'MB': st.column_config.NumberColumn('MB', format='%.2f'),
+        'MB memory-map': st.column_config.NumberColumn('MB memory-map', format='%.2f'),
+    }
+)
+
+with st.expander("Entradas"):
+    df_entradas = pd.DataFrame([
+        {
+            'Función': entrada['funcion'],
+            'Argumentos': entrada['argumentos'][:200],
+            'MB': entrada['memoria'] / MB,
+            'MB memory-map': entrada['mapeado'] / MB,
+            'Creada hace (s)': entrada['edad'],
+            'Sin usar desde hace (s)': entrada['sin_usar'],
+        }
+        for entrada in politica_cache.entradas()
+    ])
+    st.dataframe(
+        df_entradas,
+        hide_index=True,
+        width='stretch',
+        column_config={
+            'MB': st.column_config.NumberColumn('MB', format='%.2f'),
+            'MB memory-map': st.column_config.NumberColumn('MB memory-map', format='%.2f'),
+            'Creada hace (s)': st.column_config.NumberColumn('Creada hace (s)', format='%.0f'),
+            'Sin usar desde hace (s)': st.column_config.NumberColumn('Sin usar desde hace (s)', format='%.0f'),
+        }
+    )
+
+st.markdown("---")
+# Afecta a todas las sesiones del proceso: la siguiente ejecución de cada página recalcula
+if st.button("🧹 Vaciar todas las cachés"):
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    politica_cache.olvidar()
+    st.rerun()
+
+cerrar_pagina()
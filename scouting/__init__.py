@@ -0,0 +1,3 @@
+"""
+Capa compartida de datos y cálculo para las páginas de scouting de porteros
+"""
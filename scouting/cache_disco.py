@@ -0,0 +1,175 @@
+"""
+Caché en disco de tablas derivadas compartida entre procesos y reinicios
+
+Cada artefacto es un directorio con un .npy por array, identificado por la
+versión de los datos y un hash de la configuración que lo produce. Los
+procesos los abren con memory-map de solo lectura, así que varias réplicas
+comparten las mismas páginas de memoria.
+
+La caché no crece sin límite: la primera vez que un proceso usa una versión
+de los datos se borran los artefactos de las demás versiones, y tras cada
+escritura se borran los usados hace más tiempo hasta volver a
+BYTES_CACHE_DISCO. Borrar un artefacto que otro proceso tiene abierto es
+seguro: su memory-map sigue siendo válido hasta que lo suelta.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from scouting.datos import RAIZ
+
+DIRECTORIO_CACHE = Path(os.environ.get('SCOUTING_CACHE_DIR', RAIZ / '.cache_derivados'))
+
+# Cambiarla invalida todos los artefactos (por ejemplo al cambiar un cálculo)
+VERSION_ARTEFACTOS = '3'
+
+# SCOUTING_CACHE_DISCO_MB cambia el tamaño máximo de la caché en disco
+BYTES_CACHE_DISCO = int(float(os.environ.get('SCOUTING_CACHE_DISCO_MB', 2048)) * 1024 * 1024)
+
+# Directorios temporales de escrituras interrumpidas que ya se pueden borrar
+SEGUNDOS_TEMPORAL_HUERFANO = 3600
+
+# Versiones de los datos cuya caché ya se ha depurado en este proceso
+_versiones_depuradas = set()
+
+
+def hash_config(*partes):
+    """
+    Hash corto de los parámetros que determinan un artefacto
+    """
+    h = hashlib.blake2b(digest_size=8)
+    h.update(VERSION_ARTEFACTOS.encode())
+    for parte in partes:
+        if isinstance(parte, np.ndarray):
+            h.update(np.ascontiguousarray(parte).tobytes())
+        else:
+            h.update(repr(parte).encode())
+        h.update(b'|')
+    return h.hexdigest()
+
+
+def ruta_derivado(nombre, version, config=()):
+    return DIRECTORIO_CACHE / f'{nombre}-{version}-{hash_config(*config)}'
+
+
+def leer_derivado(ruta):
+    """
+    Arrays del artefacto con memory-map de solo lectura (None si no existe)
+    """
+    try:
+        arrays = {
+            fichero.stem: np.load(fichero, mmap_mode='r', allow_pickle=False)
+            for fichero in sorted(ruta.glob('*.npy'))
+        } or None
+    except (OSError, ValueError):
+        return None
+    if arrays is not None:
+        # La fecha de modificación del directorio hace de último uso para depurar_cache
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+    return arrays
+
+
+def escribir_derivado(ruta, arrays):
+    """
+    Escribe los arrays en un directorio temporal y lo renombra de una vez.
+
+    Si otro proceso ya ha publicado el mismo artefacto se conserva el suyo.
+    """
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = tempfile.mkdtemp(dir=ruta.parent, prefix='.tmp-')
+    try:
+        for nombre, array in arrays.items():
+            np.save(os.path.join(temporal, f'{nombre}.npy'), np.asarray(array), allow_pickle=False)
+        os.chmod(temporal, 0o755)
+        os.rename(temporal, ruta)
+    except OSError:
+        pass
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+
+def _version_artefacto(ruta):
+    # '{nombre}-{version}-{hash}': el nombre puede llevar guiones, la versión y el hash no
+    partes = ruta.name.rsplit('-', 2)
+    return partes[1] if len(partes) == 3 else None
+
+
+def _bytes_artefacto(ruta):
+    try:
+        return sum(fichero.stat().st_size for fichero in ruta.iterdir())
+    except OSError:
+        return 0
+
+
+def depurar_cache(version_vigente, limite_bytes=BYTES_CACHE_DISCO, conservar=None):
+    """
+    Borra los artefactos de versiones de los datos distintas de
+    `version_vigente`, los temporales huérfanos y, si la caché sigue pasando
+    de `limite_bytes`, los artefactos usados hace más tiempo (nunca
+    `conservar`). Devuelve el número de directorios borrados.
+    """
+    try:
+        directorios = [ruta for ruta in DIRECTORIO_CACHE.iterdir() if ruta.is_dir()]
+    except OSError:
+        return 0
+
+    ahora = time.time()
+    borrar = []
+    vigentes = []
+    for ruta in directorios:
+        if ruta.name.startswith('.tmp-'):
+            try:
+                if ahora - ruta.stat().st_mtime > SEGUNDOS_TEMPORAL_HUERFANO:
+                    borrar.append(ruta)
+            except OSError:
+                pass
+        elif _version_artefacto(ruta) != version_vigente:
+            borrar.append(ruta)
+        else:
+            vigentes.append(ruta)
+
+    # Del más reciente al más antiguo: se conservan mientras quepan
+    usados = []
+    for ruta in vigentes:
+        try:
+            usados.append((ruta.stat().st_mtime, ruta))
+        except OSError:
+            pass
+    total = 0
+    for _, ruta in sorted(usados, key=lambda item: -item[0]):
+        total += _bytes_artefacto(ruta)
+        if total > limite_bytes and ruta != conservar:
+            borrar.append(ruta)
+
+    for ruta in borrar:
+        shutil.rmtree(ruta, ignore_errors=True)
+    return len(borrar)
+
+
+def derivado_en_disco(nombre, version, config, calcular):
+    """
+    Devuelve los arrays del artefacto, calculándolos con `calcular()` solo si
+    no están en disco. Si el directorio de caché no admite escritura se usan
+    los arrays recién calculados.
+    """
+    if version not in _versiones_depuradas:
+        _versiones_depuradas.add(version)
+        depurar_cache(version)
+
+    ruta = ruta_derivado(nombre, version, config)
+    arrays = leer_derivado(ruta)
+    if arrays is not None:
+        return arrays
+
+    arrays = calcular()
+    escribir_derivado(ruta, arrays)
+    depurar_cache(version, conservar=ruta)
+    return leer_derivado(ruta) or arrays
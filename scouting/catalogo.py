@@ -0,0 +1,115 @@
+"""
+Catálogo de métricas compilado a partir del diccionario, con búsquedas por clave
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import streamlit as st
+
+from scouting.datos import load_data
+from scouting.rendimiento import cache_medido
+from scouting.tabla import FORMATO_DECIMAL, FORMATO_PORCENTAJE
+
+
+@dataclass(frozen=True)
+class CatalogoMetricas:
+    """
+    Nombres, categorías, ponderaciones y formato de cada métrica del diccionario.
+
+    Las métricas de porcentaje (prefijo pct_) vienen en escala 0-1 y se muestran
+    multiplicadas por 100 con FORMATO_PORCENTAJE.
+    """
+    metricas: list            # en el orden del diccionario
+    categorias: list          # en orden de aparición
+    nombre: dict              # metrica -> nombre_limpio
+    metrica: dict             # nombre_limpio -> metrica
+    categoria: dict           # metrica -> categoria
+    metricas_categoria: dict  # categoria -> [metricas]
+    ponderacion: dict         # metrica -> Ponderacion
+    invertir: dict            # metrica -> True si mayor valor = peor
+    formato: dict             # metrica -> FORMATO_*
+
+    @classmethod
+    def desde_diccionario(cls, diccionario):
+        dicc = diccionario[diccionario['metrica'].notna()]
+        metricas = list(dict.fromkeys(dicc['metrica']))
+        categorias = list(dicc['categoria'].dropna().unique())
+
+        metricas_categoria = {categoria: [] for categoria in categorias}
+        categoria = {}
+        for met, cat in zip(dicc['metrica'], dicc['categoria']):
+            if isinstance(cat, str):
+                metricas_categoria[cat].append(met)
+                categoria.setdefault(met, cat)
+
+        return cls(
+            metricas=metricas,
+            categorias=categorias,
+            nombre=dict(zip(dicc['metrica'], dicc['nombre_limpio'])),
+            metrica=dict(zip(dicc['nombre_limpio'], dicc['metrica'])),
+            categoria=categoria,
+            metricas_categoria=metricas_categoria,
+            ponderacion=dict(zip(dicc['metrica'], dicc['Ponderacion'].fillna(1).astype(float))),
+            invertir=dict(zip(dicc['metrica'], dicc['Invertir'].fillna(False).astype(bool))),
+            formato={
+                met: FORMATO_PORCENTAJE if met.startswith('pct_') else FORMATO_DECIMAL
+                for met in metricas
+            },
+        )
+
+    @property
+    def categorias_score(self):
+        """
+        Categorías que forman un score (todas menos 'Otras')
+        """
+        return [cat for cat in self.categorias if cat.lower() != 'otras']
+
+    def nombre_de(self, metrica):
+        return self.nombre.get(metrica, metrica)
+
+    def metrica_de(self, nombre):
+        return self.metrica.get(nombre, nombre)
+
+    def es_porcentaje(self, metrica):
+        return self.formato.get(metrica) == FORMATO_PORCENTAJE
+
+    def disponibles(self, columnas, categorias=None):
+        """
+        Métricas del diccionario presentes en `columnas` (en el orden del
+        diccionario), opcionalmente solo las de `categorias`
+        """
+        columnas = set(columnas)
+        if categorias:
+            columnas &= {met for cat in categorias for met in self.metricas_categoria.get(cat, [])}
+        return [met for met in self.metricas if met in columnas]
+
+    def etiquetas(self, metricas):
+        """
+        Nombre limpio de cada métrica, con sufijo numérico si se repite
+        """
+        etiquetas = {}
+        contador_nombres = {}
+        for met in metricas:
+            nombre = self.nombre_de(met)
+            if nombre in contador_nombres:
+                contador_nombres[nombre] += 1
+                nombre = f"{nombre} ({contador_nombres[nombre]})"
+            else:
+                contador_nombres[nombre] = 0
+            etiquetas[met] = nombre
+        return etiquetas
+
+    def signo(self, metricas):
+        """
+        -1 para las métricas invertidas y 1 en otro caso
+        """
+        return np.array([-1.0 if self.invertir.get(met, False) else 1.0 for met in metricas])
+
+
+@cache_medido(st.cache_resource)
+def catalogo_metricas(version):
+    """
+    Catálogo del diccionario cargado, compilado una sola vez por versión de los datos
+    """
+    _, diccionario = load_data(version)
+    return CatalogoMetricas.desde_diccionario(diccionario)
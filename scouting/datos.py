@@ -0,0 +1,93 @@
+"""
+Carga única y compartida de los ficheros de datos del proyecto
+"""
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from scouting.ingesta import VERSION_ESQUEMA, leer_consolidado
+from scouting.rendimiento import cache_medido
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# SCOUTING_CONSOLIDADO permite apuntar a otro consolidado (por ejemplo, datos sintéticos)
+RUTA_CONSOLIDADO = Path(os.environ.get('SCOUTING_CONSOLIDADO', RAIZ / 'CONSOLIDADO_metricas_por_90.csv'))
+RUTA_CONSOLIDADO_PARQUET = RUTA_CONSOLIDADO.with_suffix('.parquet')
+RUTA_DICCIONARIO = RAIZ / 'diccionario_metricas_porteros.xlsx'
+RUTA_PONDERACION_COMPETENCIAS = RAIZ / 'ponderacion_competencias.xlsx'
+
+# Minutos mínimos para entrar en el pool de percentiles y scores (umbral por defecto)
+MINUTOS_MINIMOS = 450
+
+# Con copy-on-write ningún filtro o selección sobre los DataFrames compartidos
+# puede escribir de vuelta en ellos (por defecto a partir de pandas 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+@lru_cache(maxsize=16)
+def _hash_fichero(ruta, tamano, mtime_ns):
+    # Solo se vuelve a leer el fichero cuando cambia su tamaño o fecha de modificación
+    h = hashlib.blake2b(digest_size=8)
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def version_datos():
+    """
+    Huella de la versión actual del consolidado, el diccionario y las ponderaciones.
+
+    Es la clave de todas las cachés derivadas: cualquier cambio en los ficheros
+    produce una versión nueva y las tablas se recalculan, igual que un cambio de
+    VERSION_ESQUEMA. Guardar un fichero sin cambiar su contenido mantiene la versión.
+    """
+    partes = [f'esquema:{VERSION_ESQUEMA}']
+    for ruta in (RUTA_CONSOLIDADO, RUTA_DICCIONARIO, RUTA_PONDERACION_COMPETENCIAS):
+        try:
+            stat = ruta.stat()
+        except FileNotFoundError:
+            partes.append(f'{ruta.name}:-')
+            continue
+        partes.append(_hash_fichero(str(ruta), stat.st_size, stat.st_mtime_ns))
+    return hashlib.blake2b('|'.join(partes).encode(), digest_size=8).hexdigest()
+
+
+def load_data(version=None):
+    """
+    Carga el consolidado y el diccionario de métricas una sola vez por versión de los datos.
+
+    Los DataFrames devueltos son compartidos entre páginas y sesiones:
+    se pueden filtrar y seleccionar libremente, pero nunca modificar en sitio.
+    El consolidado sale del artefacto Parquet (texto como categóricas, métricas
+    en float64) y solo se vuelve a leer el CSV cuando este ha cambiado.
+    """
+    return _cargar_datos(version or version_datos())
+
+
+@cache_medido(st.cache_resource)
+def _cargar_datos(version):
+    df = leer_consolidado(RUTA_CONSOLIDADO, RUTA_CONSOLIDADO_PARQUET)
+    diccionario = pd.read_excel(RUTA_DICCIONARIO)
+    return df, diccionario
+
+
+def load_ponderacion_competencias(version=None):
+    """
+    Devuelve el diccionario Competencia -> Ponderacion_Competencia (vacío si no hay fichero)
+    """
+    return _cargar_ponderacion_competencias(version or version_datos())
+
+
+@cache_medido(st.cache_resource)
+def _cargar_ponderacion_competencias(version):
+    try:
+        df_pond_comp = pd.read_excel(RUTA_PONDERACION_COMPETENCIAS)
+        return dict(zip(df_pond_comp['Competencia'], df_pond_comp['Ponderacion_Competencia']))
+    except Exception:
+        return {}
@@ -0,0 +1,60 @@
+"""
+Muestreo de nubes de puntos grandes para los scatter
+"""
+import numpy as np
+
+# Por encima de estos puntos el scatter se dibuja con WebGL (el mismo corte que
+# render_mode='auto' de plotly.express); por debajo SVG, más nítido
+UMBRAL_WEBGL = 1000
+
+# Puntos que se envían como mucho al navegador; más allá se muestrea por densidad
+MAX_PUNTOS_DISPERSION = 20_000
+
+# Casillas por eje del muestreo (CELDAS_MUESTREO² debe caber en MAX_PUNTOS_DISPERSION)
+CELDAS_MUESTREO = 100
+
+# Con más puntos dibujados, los nombres sobre el gráfico se omiten
+LIMITE_NOMBRES = 5_000
+
+
+def _casillas(valores, celdas):
+    minimo, maximo = valores.min(), valores.max()
+    if maximo <= minimo:
+        return np.zeros(len(valores), dtype=np.int64)
+    return np.minimum(((valores - minimo) / (maximo - minimo) * celdas).astype(np.int64), celdas - 1)
+
+
+def muestreo_por_densidad(x, y, maximo, orden, celdas=CELDAS_MUESTREO):
+    """
+    Posiciones (ordenadas) de como mucho `maximo` puntos de (x, y) que conservan
+    la forma de la nube.
+
+    El plano se divide en celdas × celdas casillas y cada casilla conserva la
+    misma fracción de sus puntos, con al menos uno: las zonas densas siguen
+    siéndolo y los puntos aislados no desaparecen. Dentro de cada casilla se
+    eligen los primeros según `orden` (una clave estable y sin relación con los
+    valores, como las claves de jugador), así que la muestra no cambia entre
+    reruns.
+    """
+    n = len(x)
+    if n <= maximo:
+        return np.arange(n)
+
+    casilla = _casillas(x, celdas) * celdas + _casillas(y, celdas)
+    orden_filas = np.lexsort((orden, casilla))
+    casilla_ordenada = casilla[orden_filas]
+    inicios = np.flatnonzero(np.r_[True, casilla_ordenada[1:] != casilla_ordenada[:-1]])
+    conteos = np.diff(np.r_[inicios, n])
+
+    # Mayor fracción común que cabe en `maximo` (búsqueda binaria)
+    bajo, alto = 0.0, 1.0
+    for _ in range(30):
+        medio = (bajo + alto) / 2
+        if np.maximum(1, np.floor(conteos * medio)).sum() <= maximo:
+            bajo = medio
+        else:
+            alto = medio
+    cupo = np.maximum(1, np.floor(conteos * bajo)).astype(np.int64)
+
+    posicion_en_casilla = np.arange(n) - np.repeat(inicios, conteos)
+    return np.sort(orden_filas[posicion_en_casilla < np.repeat(cupo, conteos)])
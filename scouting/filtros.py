@@ -0,0 +1,177 @@
+"""
+Motor de filtros de la barra lateral: una sola máscara para todos los filtros activos
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from scouting.datos import MINUTOS_MINIMOS, load_data
+from scouting.rendimiento import cache_medido
+
+COLUMNAS_RANGO = ['minutos_totales', 'age', 'height']
+COLUMNAS_CATEGORICAS = ['Competencia', 'Temporada']
+
+# Umbral de minutos del pool de percentiles y scores elegido en la sesión
+CLAVE_MINUTOS_MINIMOS = 'minutos_minimos'
+
+
+class IndiceFiltros:
+    """
+    Arrays ordenados para las columnas de rango y códigos enteros para las
+    categóricas, de modo que cada filtro se evalúa con búsqueda binaria o
+    una tabla de consulta en lugar de comparar columnas del DataFrame.
+    """
+
+    def __init__(self, df, columnas_rango, columnas_categoricas):
+        self.n_filas = len(df)
+
+        # columna -> (orden, valores ordenados sin NaN, posiciones de los NaN)
+        self._rango = {}
+        for columna in columnas_rango:
+            valores = df[columna].to_numpy(dtype=float)
+            orden = np.argsort(valores, kind='stable')
+            n_validos = int((~np.isnan(valores)).sum())
+            self._rango[columna] = (orden[:n_validos], valores[orden[:n_validos]], orden[n_validos:])
+
+        # columna -> (códigos por fila, valor -> código)
+        self._categorias = {}
+        for columna in columnas_categoricas:
+            codigos, unicos = pd.factorize(df[columna])
+            self._categorias[columna] = (codigos, {valor: i for i, valor in enumerate(unicos)})
+
+    def mascara_rango(self, columna, minimo, maximo, incluir_nulos=False):
+        """
+        Filas con minimo <= valor <= maximo (y las nulas si incluir_nulos)
+        """
+        orden, ordenados, nulos = self._rango[columna]
+        inicio = np.searchsorted(ordenados, minimo, side='left')
+        fin = np.searchsorted(ordenados, maximo, side='right')
+
+        mascara = np.zeros(self.n_filas, dtype=bool)
+        mascara[orden[inicio:fin]] = True
+        if incluir_nulos:
+            mascara[nulos] = True
+        return mascara
+
+    def mascara_categorias(self, columna, valores):
+        """
+        Filas cuya categoría está en `valores`
+        """
+        codigos, posicion = self._categorias[columna]
+        # La última posición corresponde a los nulos (código -1)
+        seleccion = np.zeros(len(posicion) + 1, dtype=bool)
+        for valor in valores:
+            if valor in posicion:
+                seleccion[posicion[valor]] = True
+        return seleccion[codigos]
+
+    def mascara(self, rangos=None, categorias=None, incluir_nulos=()):
+        """
+        Combina todos los filtros activos en una única máscara booleana.
+
+        `rangos` es {columna: (minimo, maximo)} y `categorias` es
+        {columna: valores}; una lista de valores vacía no filtra.
+        """
+        mascara = np.ones(self.n_filas, dtype=bool)
+        for columna, (minimo, maximo) in (rangos or {}).items():
+            mascara &= self.mascara_rango(columna, minimo, maximo, columna in incluir_nulos)
+        for columna, valores in (categorias or {}).items():
+            if valores:
+                mascara &= self.mascara_categorias(columna, valores)
+        return mascara
+
+    def filas(self, rangos=None, categorias=None, incluir_nulos=()):
+        """
+        Posiciones de las filas que cumplen todos los filtros
+        """
+        return np.flatnonzero(self.mascara(rangos, categorias, incluir_nulos))
+
+
+@cache_medido(st.cache_resource)
+def indice_filtros(version):
+    """
+    Índice de filtros sobre el consolidado compartido
+    """
+    df, _ = load_data(version)
+    columnas_rango = [col for col in COLUMNAS_RANGO if col in df.columns]
+    return IndiceFiltros(df, columnas_rango, COLUMNAS_CATEGORICAS)
+
+
+def filtros_pool(min_minutos, competencias, temporadas, edad_range):
+    """
+    (rangos, categorias) del pool de comparación del Perfil Individual, para IndiceFiltros
+    """
+    rangos = {'minutos_totales': (min_minutos, np.inf)}
+    if edad_range is not None:
+        rangos['age'] = tuple(edad_range)
+    return rangos, {'Competencia': list(competencias), 'Temporada': list(temporadas)}
+
+
+def pool_comparacion(version, min_minutos, competencias, temporadas, edad_range):
+    """
+    Pool de comparación del Perfil Individual según los filtros de la barra lateral
+    """
+    df, _ = load_data(version)
+    rangos, categorias = filtros_pool(min_minutos, competencias, temporadas, edad_range)
+    return df.iloc[indice_filtros(version).filas(rangos=rangos, categorias=categorias)]
+
+
+@cache_medido(st.cache_resource)
+def orden_columna(version, columna, descendente=False):
+    """
+    Orden estable de las filas del consolidado por `columna`, con los nulos al final
+    """
+    df, _ = load_data(version)
+    valores = df[columna].to_numpy(dtype=float)
+    # -NaN sigue siendo NaN, así que también queda al final en orden descendente
+    return np.argsort(-valores if descendente else valores, kind='stable').astype(np.int32)
+
+
+def paginar(version, mascara, columna, descendente, pagina, filas_por_pagina):
+    """
+    Devuelve las posiciones de las filas de `pagina` (empezando en 1) y las de
+    todas las filas que cumplen `mascara`, ambas ordenadas por `columna`
+    """
+    orden = orden_columna(version, columna, descendente)
+    seleccion = orden[mascara[orden]]
+    inicio = (pagina - 1) * filas_por_pagina
+    return seleccion[inicio:inicio + filas_por_pagina], seleccion
+
+
+@cache_medido(st.cache_resource)
+def csv_filtrado(version, mascara, columna, descendente):
+    """
+    CSV (bytes) de todas las filas de `mascara` ordenadas por `columna`, para la descarga
+    """
+    df, _ = load_data(version)
+    orden = orden_columna(version, columna, descendente)
+    return df.iloc[orden[mascara[orden]]].to_csv(index=False).encode('utf-8')
+
+
+def minutos_minimos_sesion():
+    """
+    Umbral de minutos elegido en la sesión (MINUTOS_MINIMOS si no se ha cambiado)
+    """
+    return int(st.session_state.get(CLAVE_MINUTOS_MINIMOS, MINUTOS_MINIMOS))
+
+
+def selector_minutos_minimos(version):
+    """
+    Umbral de minutos del pool de percentiles y scores en la barra lateral,
+    acotado a los minutos máximos del consolidado.
+
+    El valor se guarda en la sesión para que las demás páginas partan de él;
+    las tablas de los últimos umbrales quedan en caché (UMBRALES_EN_CACHE en scouting.politica_cache).
+    """
+    df, _ = load_data(version)
+    max_minutos = int(df['minutos_totales'].max())
+    minutos_minimos = st.sidebar.number_input(
+        "Minutos mínimos del pool",
+        min_value=0,
+        max_value=max_minutos,
+        value=min(minutos_minimos_sesion(), max_minutos),
+        step=90,
+        help="Los percentiles y scores se calculan entre los porteros con al menos estos minutos"
+    )
+    st.session_state[CLAVE_MINUTOS_MINIMOS] = int(minutos_minimos)
+    return int(minutos_minimos)
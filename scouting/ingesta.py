@@ -0,0 +1,112 @@
+"""
+Ingesta del consolidado: artefacto Parquet con esquema explícito generado desde el CSV
+
+Uso: python -m scouting.ingesta
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Columnas de texto repetidas: se guardan como categóricas (códigos enteros + diccionario).
+# playerId es un identificador alfanumérico, así que también se codifica como categórica
+COLUMNAS_CATEGORICAS_CONSOLIDADO = ['playerId', 'jugador', 'TeamName', 'Competencia', 'Temporada']
+
+# Versión del esquema: cambiarla invalida los artefactos ya generados
+VERSION_ESQUEMA = '2'
+
+CLAVE_ORIGEN = b'scouting.origen'
+
+
+def huella_fichero(ruta):
+    """
+    Tamaño y fecha de modificación del fichero, suficientes para detectar cambios
+    """
+    stat = os.stat(ruta)
+    return f'{VERSION_ESQUEMA}:{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def aplicar_esquema(df):
+    """
+    Categóricas para las columnas de texto e int32 para los contadores.
+
+    Las métricas se quedan en float64: en float32 valores distintos del CSV
+    pasan a empatar (o dejan de hacerlo) y cambian los percentiles y scores.
+    """
+    tipos = {}
+    for columna in df.columns:
+        if columna in COLUMNAS_CATEGORICAS_CONSOLIDADO:
+            tipos[columna] = 'category'
+        elif pd.api.types.is_integer_dtype(df[columna]):
+            tipos[columna] = np.int32
+    return df.astype(tipos)
+
+
+def leer_csv(ruta_csv):
+    return aplicar_esquema(pd.read_csv(ruta_csv))
+
+
+def artefacto_vigente(ruta_csv, ruta_artefacto):
+    """
+    True si el artefacto existe y se generó a partir de la versión actual del CSV
+    """
+    try:
+        import pyarrow.parquet as pq
+        metadatos = pq.read_schema(ruta_artefacto).metadata or {}
+    except Exception:
+        return False
+    return metadatos.get(CLAVE_ORIGEN) == huella_fichero(ruta_csv).encode()
+
+
+def escribir_artefacto(df, ruta_csv, ruta_artefacto):
+    """
+    Escribe df en Parquet con la huella del CSV de origen en los metadatos.
+
+    Se escribe en un temporal y se renombra para que ningún proceso lea un fichero a medias.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    metadatos = dict(tabla.schema.metadata or {})
+    metadatos[CLAVE_ORIGEN] = huella_fichero(ruta_csv).encode()
+    tabla = tabla.replace_schema_metadata(metadatos)
+
+    directorio = os.path.dirname(os.path.abspath(ruta_artefacto))
+    fd, temporal = tempfile.mkstemp(dir=directorio, suffix='.parquet.tmp')
+    os.close(fd)
+    try:
+        pq.write_table(tabla, temporal)
+        # mkstemp crea el fichero solo legible por el propietario
+        os.chmod(temporal, 0o644)
+        os.replace(temporal, ruta_artefacto)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def leer_consolidado(ruta_csv, ruta_artefacto):
+    """
+    Lee el artefacto Parquet si está al día; si no, lee el CSV y regenera el artefacto.
+
+    Sin pyarrow, o si el directorio no admite escritura, se sigue usando el CSV.
+    """
+    if artefacto_vigente(ruta_csv, ruta_artefacto):
+        return pd.read_parquet(ruta_artefacto)
+
+    df = leer_csv(ruta_csv)
+    try:
+        escribir_artefacto(df, ruta_csv, ruta_artefacto)
+    except Exception:
+        pass
+    return df
+
+
+if __name__ == '__main__':
+    from scouting.datos import RUTA_CONSOLIDADO, RUTA_CONSOLIDADO_PARQUET
+
+    df = leer_csv(RUTA_CONSOLIDADO)
+    escribir_artefacto(df, RUTA_CONSOLIDADO, RUTA_CONSOLIDADO_PARQUET)
+    print(f'{RUTA_CONSOLIDADO_PARQUET.name}: {len(df)} filas, '
+          f'{df.memory_usage(deep=True).sum() / 1e6:.1f} MB en memoria')
@@ -0,0 +1,93 @@
+"""
+Clave entera de cada fila jugador-temporada e índice clave -> fila del consolidado
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from scouting.datos import load_data
+from scouting.rendimiento import cache_medido
+
+# Columnas que identifican una fila: el mismo portero en otra temporada, equipo o liga es otra fila
+COLUMNAS_IDENTIDAD = ['jugador', 'Temporada', 'TeamName', 'Competencia']
+
+
+def claves_jugador(df):
+    """
+    Clave int64 de cada fila a partir de sus columnas de identidad.
+
+    Depende solo de los valores, no de la posición ni de la versión de los
+    datos, así que una selección guardada en la sesión sigue siendo válida al
+    recargar el consolidado.
+    """
+    return pd.util.hash_pandas_object(df[COLUMNAS_IDENTIDAD], index=False).to_numpy().view(np.int64)
+
+
+class IndiceJugadores:
+    """
+    Claves, etiquetas y orden alfabético de las filas del consolidado.
+
+    Todas las tablas derivadas (scores, percentiles) están alineadas fila a fila
+    con el consolidado, así que la posición que devuelve `fila` sirve con
+    .iloc en cualquiera de ellas.
+    """
+
+    def __init__(self, df):
+        self.claves = claves_jugador(df)
+        # Con filas repetidas gana la primera, como el antiguo filtro + iloc[0]
+        self.posicion = {}
+        for fila, clave in enumerate(self.claves.tolist()):
+            self.posicion.setdefault(clave, fila)
+        self.es_primera = np.zeros(len(df), dtype=bool)
+        self.es_primera[list(self.posicion.values())] = True
+
+        # 'Jugador - Temporada - Equipo - Competencia', calculadas una vez por versión
+        self.etiquetas = (
+            df['jugador'].astype(str) + ' - ' + df['Temporada'].astype(str) + ' - '
+            + df['TeamName'].astype(str) + ' - ' + df['Competencia'].astype(str)
+        ).to_numpy()
+        # Texto del hover de los scatter: 'Jugador<br>Equipo<br>Competencia - Temporada'
+        self.hover = (
+            df['jugador'].astype(str) + '<br>' + df['TeamName'].astype(str) + '<br>'
+            + df['Competencia'].astype(str) + ' - ' + df['Temporada'].astype(str)
+        ).to_numpy()
+        # Rango de cada fila en orden alfabético de etiqueta: ordenar una selección es un argsort de enteros
+        self.rango_etiqueta = np.empty(len(df), dtype=np.int64)
+        self.rango_etiqueta[np.argsort(self.etiquetas, kind='stable')] = np.arange(len(df))
+
+        for array in (self.claves, self.es_primera, self.etiquetas, self.hover, self.rango_etiqueta):
+            array.flags.writeable = False
+
+    def fila(self, clave):
+        return self.posicion[clave]
+
+    def filas(self, claves):
+        """
+        Posiciones de las claves presentes, en el orden recibido
+        """
+        return np.array([self.posicion[c] for c in claves if c in self.posicion], dtype=np.int64)
+
+    def clave(self, fila):
+        return int(self.claves[fila])
+
+    def etiqueta(self, clave):
+        return self.etiquetas[self.posicion[clave]]
+
+    def opciones(self, filas):
+        """
+        Claves (int) de `filas` en orden alfabético de etiqueta, para un selector
+        (las filas repetidas del consolidado aparecen una sola vez)
+        """
+        filas = np.asarray(filas)
+        filas = filas[self.es_primera[filas]]
+        filas = filas[np.argsort(self.rango_etiqueta[filas], kind='stable')]
+        return self.claves[filas].tolist()
+
+
+@cache_medido(st.cache_resource)
+def indice_jugadores(version):
+    """
+    Índice de jugadores del consolidado compartido, construido una vez por versión
+    """
+    df, _ = load_data(version)
+    return IndiceJugadores(df)
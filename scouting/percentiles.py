@@ -0,0 +1,380 @@
+"""
+Cubo precalculado de percentiles por métrica y contexto de comparación
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from scouting.cache_disco import derivado_en_disco
+from scouting.datos import load_data
+from scouting.filtros import pool_comparacion
+from scouting.rendimiento import cache_medido
+
+CONTEXTO_GLOBAL = 'global'
+CONTEXTO_COMPETENCIA = 'competencia'
+CONTEXTO_COMPETENCIA_TEMPORADA = 'competencia_temporada'
+
+CONTEXTOS = [CONTEXTO_GLOBAL, CONTEXTO_COMPETENCIA, CONTEXTO_COMPETENCIA_TEMPORADA]
+
+# Pools con menos de 1/FRACCION_POOL_PEQUENO filas del consolidado: OrdenMetricas
+# ordena las posiciones de sus filas en lugar de recorrer el orden completo
+FRACCION_POOL_PEQUENO = 16
+
+# Columnas que definen los grupos de cada contexto
+COLUMNAS_CONTEXTO = {
+    CONTEXTO_GLOBAL: [],
+    CONTEXTO_COMPETENCIA: ['Competencia'],
+    CONTEXTO_COMPETENCIA_TEMPORADA: ['Competencia', 'Temporada'],
+}
+
+
+@dataclass(frozen=True)
+class CuboPercentiles:
+    """
+    Percentiles (0-100) métrica x fila del consolidado para cada contexto.
+
+    Cada capa es una matriz (n_filas, n_metricas) alineada con las filas del
+    DataFrame original. Vale NaN para las filas fuera del pool de minutos
+    mínimos y para los jugadores sin dato en la métrica.
+    """
+    metricas: list
+    indice_metrica: dict
+    capas: dict
+
+    def percentiles(self, contexto, filas=None, metricas=None):
+        """
+        Devuelve la submatriz de percentiles para las filas y métricas pedidas
+        """
+        capa = self.capas[contexto]
+        if metricas is not None:
+            capa = capa[:, [self.indice_metrica[m] for m in metricas]]
+        if filas is not None:
+            capa = capa[filas]
+        return capa
+
+    def percentil(self, contexto, fila, metrica):
+        return self.capas[contexto][fila, self.indice_metrica[metrica]]
+
+
+def _metricas_y_signo(df, diccionario):
+    dicc = diccionario[diccionario['metrica'].isin(df.columns)].drop_duplicates('metrica')
+    signo = np.where(dicc['Invertir'].fillna(False).astype(bool).to_numpy(), -1.0, 1.0)
+    return dicc['metrica'].tolist(), signo
+
+
+def _solo_lectura(matriz):
+    matriz.flags.writeable = False
+    return matriz
+
+
+def _capa(valores, mascara, grupos=None):
+    # Rango medio agrupado sobre todas las métricas a la vez
+    df_valores = pd.DataFrame(valores)
+    if grupos is None:
+        rangos = df_valores.rank(pct=True, method='average', na_option='keep')
+    else:
+        rangos = df_valores.groupby(grupos, sort=False).rank(pct=True, method='average', na_option='keep')
+
+    capa = np.full((len(mascara), valores.shape[1]), np.nan)
+    capa[mascara] = rangos.to_numpy() * 100
+    return _solo_lectura(capa)
+
+
+class OrdenMetricas:
+    """
+    Cada métrica del cubo ordenada una sola vez sobre todo el consolidado
+    (con el signo aplicado), con el inicio de su grupo de empate.
+
+    El percentil de una fila dentro de cualquier pool sale de su puesto entre
+    las filas del pool en ese orden y del tamaño de su grupo de empate dentro
+    del pool: no se ordena ningún valor por pool. Coincide con rank(pct=True,
+    method='average') sobre las filas del pool, es decir, con la capa global de
+    un cubo construido sobre ese pool.
+
+    Los arrays se guardan por métrica (n_metricas, n_filas) para que cada
+    métrica se recorra en memoria contigua.
+    """
+
+    def __init__(self, metricas, orden, posicion, inicio_empate, n_validos):
+        self.metricas = list(metricas)
+        self.indice_metrica = {metrica: j for j, metrica in enumerate(self.metricas)}
+        self.orden = orden                  # (n_metricas, n_filas) filas en orden ascendente, NaN al final
+        self.posicion = posicion            # posición de cada fila en ese orden (inversa de orden)
+        self.inicio_empate = inicio_empate  # primera posición ordenada del grupo de empate
+        self.n_validos = n_validos          # filas con dato de cada métrica (las primeras de su orden)
+
+    @staticmethod
+    def calcular(valores):
+        """
+        Arrays del orden de una matriz (n_filas, n_metricas) ya con el signo aplicado
+        """
+        valores = np.ascontiguousarray(np.asarray(valores, dtype=float).T)
+        orden = np.argsort(valores, axis=1, kind='stable')
+        ordenados = np.take_along_axis(valores, orden, axis=1)
+
+        posiciones = np.arange(ordenados.shape[1])
+        posicion = np.empty(orden.shape, dtype=np.int32)
+        np.put_along_axis(posicion, orden, posiciones, axis=1)
+
+        nuevo_grupo = np.ones(ordenados.shape, dtype=bool)
+        nuevo_grupo[:, 1:] = ordenados[:, 1:] != ordenados[:, :-1]
+        inicio = np.maximum.accumulate(np.where(nuevo_grupo, posiciones, 0), axis=1)
+        return {
+            'orden': orden.astype(np.int32),
+            'posicion': posicion,
+            'inicio_empate': inicio.astype(np.int32),
+            'n_validos': (~np.isnan(ordenados)).sum(axis=1),
+        }
+
+    def percentiles_pool(self, mascara, metricas=None):
+        """
+        Matriz (n_filas_pool, n_metricas) de percentiles 0-100 de las filas de
+        `mascara`, en su orden (NaN sin dato), para `metricas` o todas.
+
+        Con un pool pequeño solo se leen y ordenan las posiciones de sus filas;
+        con uno grande sale más barato leer la máscara en el orden guardado.
+        """
+        columnas = range(len(self.metricas)) if metricas is None else [self.indice_metrica[m] for m in metricas]
+        filas = np.flatnonzero(mascara)
+        resultado = np.full((len(columnas), len(filas)), np.nan)
+        if len(filas) == 0:
+            return resultado.T
+
+        pool_pequeno = len(filas) * FRACCION_POOL_PEQUENO < len(mascara)
+        if not pool_pequeno:
+            posicion_pool = np.zeros(len(mascara), dtype=np.intp)
+            posicion_pool[filas] = np.arange(len(filas))
+
+        for i, j in enumerate(columnas):
+            if pool_pequeno:
+                # Posiciones ordenadas de las filas del pool y su índice dentro del pool
+                posiciones = self.posicion[j, filas]
+                indices = np.argsort(posiciones)
+                posiciones = posiciones[indices]
+                n_validos = np.searchsorted(posiciones, self.n_validos[j])
+                posiciones, indices = posiciones[:n_validos], indices[:n_validos]
+            else:
+                orden = self.orden[j, :self.n_validos[j]]
+                posiciones = np.flatnonzero(mascara[orden])
+                indices = posicion_pool[orden[posiciones]]
+            if len(posiciones) == 0:
+                continue
+
+            # Grupos de empate dentro del pool: tramos con el mismo inicio de grupo global
+            grupos = self.inicio_empate[j, posiciones]
+            nuevo_grupo = np.ones(len(grupos), dtype=bool)
+            nuevo_grupo[1:] = grupos[1:] != grupos[:-1]
+            inicios = np.flatnonzero(nuevo_grupo)
+            tamanos = np.diff(np.append(inicios, len(grupos)))
+
+            # Rango medio: filas del pool por debajo del grupo + (tamaño del grupo + 1) / 2
+            rangos = np.repeat(inicios + (tamanos + 1) / 2, tamanos)
+            resultado[i, indices] = rangos / len(posiciones) * 100
+        return resultado.T
+
+    def percentiles(self, mascara, metricas=None):
+        """
+        Como percentiles_pool, alineada con todas las filas del consolidado (NaN fuera del pool)
+        """
+        pool = self.percentiles_pool(mascara, metricas)
+        percentiles = np.full((len(mascara), pool.shape[1]), np.nan)
+        percentiles[mascara] = pool
+        return percentiles
+
+
+@cache_medido(st.cache_resource)
+def orden_metricas(version):
+    """
+    Orden por métrica de todo el consolidado: percentiles de cualquier pool
+    (otro umbral de minutos, los filtros de una página) sin volver a ordenar
+    """
+    df, diccionario = load_data(version)
+    metricas, signo = _metricas_y_signo(df, diccionario)
+
+    def calcular():
+        return OrdenMetricas.calcular(df[metricas].to_numpy(dtype=float) * signo)
+
+    arrays = derivado_en_disco('orden_metricas', version, (metricas, signo), calcular)
+    return OrdenMetricas(metricas, **arrays)
+
+
+@cache_medido(st.cache_resource)
+def calcular_cubo_percentiles(version, minutos_minimos):
+    """
+    Construye el cubo de percentiles dentro del pool de `minutos_minimos`:
+    global, por Competencia y por Competencia + Temporada
+    """
+    df, diccionario = load_data(version)
+    metricas, signo = _metricas_y_signo(df, diccionario)
+
+    def calcular():
+        mascara = (df['minutos_totales'] >= minutos_minimos).to_numpy()
+        df_trabajo = df[mascara]
+
+        # Invertir si es necesario (mayor valor = peor)
+        valores = df_trabajo[metricas].to_numpy(dtype=float) * signo
+
+        competencia = pd.factorize(df_trabajo['Competencia'])[0]
+        competencia_temporada = pd.factorize(
+            df_trabajo['Competencia'].astype(str) + '|' + df_trabajo['Temporada'].astype(str)
+        )[0]
+
+        return {
+            CONTEXTO_GLOBAL: _capa(valores, mascara),
+            CONTEXTO_COMPETENCIA: _capa(valores, mascara, competencia),
+            CONTEXTO_COMPETENCIA_TEMPORADA: _capa(valores, mascara, competencia_temporada),
+        }
+
+    capas = derivado_en_disco('cubo', version, (minutos_minimos, metricas, signo), calcular)
+    indice_metrica = {metrica: i for i, metrica in enumerate(metricas)}
+    return CuboPercentiles(metricas, indice_metrica, capas)
+
+
+@cache_medido(st.cache_resource)
+def calcular_percentiles_variables(version, minutos_minimos):
+    """
+    Calcula percentiles (0-100) para cada métrica disponible (tabla compartida, de solo lectura)
+    """
+    df, diccionario = load_data(version)
+    orden = orden_metricas(version)
+    nombre_map = dict(zip(diccionario['metrica'], diccionario['nombre_limpio']))
+
+    df_percentiles = df[['jugador', 'TeamName', 'Competencia', 'Temporada', 'minutos_totales']].copy()
+
+    # Capa global del pool (la misma del cubo) sin re-ordenar para cada umbral
+    en_pool = (df['minutos_totales'] >= minutos_minimos).to_numpy()
+    capa = orden.percentiles(en_pool)
+    con_datos = ~np.isnan(capa[en_pool]).all(axis=0)
+
+    # Jugadores sin datos o con menos minutos obtienen percentil 0
+    columnas = {
+        f'Percentil_{nombre_map[metrica]}': np.nan_to_num(capa[:, j], nan=0.0)
+        for j, metrica in enumerate(orden.metricas) if con_datos[j]
+    }
+    return pd.concat([df_percentiles, pd.DataFrame(columnas, index=df.index)], axis=1)
+
+
+class IndiceECDF:
+    """
+    Valores ordenados por (grupo de contexto, métrica) para consultar percentiles
+    con búsqueda binaria en lugar de recorrer la distribución.
+
+    Las métricas invertidas se guardan cambiadas de signo, igual que en el cubo,
+    de modo que el percentil de una fila del pool coincide con su rango medio.
+    """
+
+    def __init__(self, df_referencia, metricas, signo, columnas_grupo=()):
+        self.metricas = list(metricas)
+        self.indice_metrica = {metrica: j for j, metrica in enumerate(self.metricas)}
+        self.signo = np.asarray(signo, dtype=float)
+        self.columnas_grupo = list(columnas_grupo)
+
+        if self.columnas_grupo:
+            codigos, claves = pd.MultiIndex.from_frame(df_referencia[self.columnas_grupo]).factorize()
+            self.grupos = {clave: g for g, clave in enumerate(claves)}
+        else:
+            codigos = np.zeros(len(df_referencia), dtype=np.intp)
+            self.grupos = {(): 0}
+
+        orden = np.argsort(codigos, kind='stable')
+        codigos = codigos[orden]
+        valores = df_referencia[self.metricas].to_numpy(dtype=float)[orden] * self.signo
+
+        # Dentro de cada grupo, cada columna ordenada de menor a mayor con los NaN al final
+        ordenados = np.empty_like(valores)
+        for j in range(valores.shape[1]):
+            ordenados[:, j] = valores[np.lexsort((valores[:, j], codigos)), j]
+
+        tamanos = np.bincount(codigos, minlength=len(self.grupos))
+        self.inicio = np.concatenate([[0], np.cumsum(tamanos)[:-1]])
+        validos = ~np.isnan(ordenados)
+        self.n_validos = np.add.reduceat(validos, self.inicio, axis=0) if len(ordenados) else np.zeros((0, len(self.metricas)), dtype=int)
+        self.ordenados = _solo_lectura(ordenados)
+
+    def _busqueda(self, lo, hi, columnas, x, estricto):
+        # Búsqueda binaria vectorizada sobre todas las consultas a la vez
+        lo = lo.copy()
+        hi = hi.copy()
+        activo = lo < hi
+        tope = len(self.ordenados) - 1
+        while activo.any():
+            medio = (lo + hi) // 2
+            v = self.ordenados[np.minimum(medio, tope), columnas]
+            derecha = (v < x) if estricto else (v <= x)
+            lo = np.where(activo & derecha, medio + 1, lo)
+            hi = np.where(activo & ~derecha, medio, hi)
+            activo = lo < hi
+        return lo
+
+    def percentiles(self, claves, valores, metricas=None, nuevos=False):
+        """
+        Percentil (0-100) de cada valor dentro de la distribución de su grupo.
+
+        `claves` trae una clave de grupo por consulta (tuplas con los valores de
+        `columnas_grupo`, o () sin agrupación) y `valores` una matriz
+        (n_consultas, n_metricas) en unidades originales. Con `nuevos=False` los
+        valores se consideran parte de la distribución (mismo resultado que el
+        cubo); con `nuevos=True` se devuelve el percentil que obtendría la fila
+        al añadirse al pool. Devuelve NaN si el valor o el grupo no tienen datos.
+        """
+        metricas = self.metricas if metricas is None else list(metricas)
+        columnas = np.array([self.indice_metrica[m] for m in metricas], dtype=np.intp)
+        x = np.atleast_2d(np.asarray(valores, dtype=float)) * self.signo[columnas]
+
+        grupo = np.array([self.grupos.get(tuple(clave), -1) for clave in claves], dtype=np.intp)
+        conocido = grupo >= 0
+        grupo = np.where(conocido, grupo, 0)
+
+        inicio = np.broadcast_to(self.inicio[grupo][:, None], x.shape)
+        n = np.where(conocido[:, None], self.n_validos[grupo][:, columnas], 0)
+        fin = inicio + n
+        izquierda = self._busqueda(inicio, fin, columnas, x, estricto=True)
+        derecha = self._busqueda(izquierda, fin, columnas, x, estricto=False)
+
+        menores = izquierda - inicio
+        iguales = derecha - izquierda
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if nuevos:
+                resultado = (menores + (iguales + 2) / 2) / (n + 1) * 100
+            else:
+                resultado = (menores + (iguales + 1) / 2) / n * 100
+        resultado[np.isnan(x) | (n == 0)] = np.nan
+        return resultado
+
+    def percentiles_frame(self, df_consulta, metricas=None, nuevos=False):
+        """
+        Igual que `percentiles` tomando claves y valores de las columnas de df_consulta
+        """
+        metricas = self.metricas if metricas is None else list(metricas)
+        if self.columnas_grupo:
+            claves = list(df_consulta[self.columnas_grupo].itertuples(index=False, name=None))
+        else:
+            claves = [()] * len(df_consulta)
+        return self.percentiles(claves, df_consulta[metricas].to_numpy(dtype=float), metricas, nuevos)
+
+
+@cache_medido(st.cache_resource)
+def calcular_indices_ecdf(version, minutos_minimos):
+    """
+    Índice ECDF de cada contexto del cubo sobre el pool de `minutos_minimos`
+    """
+    df, diccionario = load_data(version)
+    metricas, signo = _metricas_y_signo(df, diccionario)
+    df_trabajo = df[df['minutos_totales'] >= minutos_minimos]
+    return {
+        contexto: IndiceECDF(df_trabajo, metricas, signo, columnas)
+        for contexto, columnas in COLUMNAS_CONTEXTO.items()
+    }
+
+
+@cache_medido(st.cache_resource)
+def calcular_ecdf_pool(version, min_minutos, competencias, temporadas, edad_range):
+    """
+    Índice ECDF por Competencia + Temporada de un pool personalizado del Perfil Individual
+    """
+    df, diccionario = load_data(version)
+    df_pool = pool_comparacion(version, min_minutos, competencias, temporadas, edad_range)
+    metricas, signo = _metricas_y_signo(df, diccionario)
+    return IndiceECDF(df_pool, metricas, signo, COLUMNAS_CONTEXTO[CONTEXTO_COMPETENCIA_TEMPORADA])
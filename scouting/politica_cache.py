@@ -0,0 +1,306 @@
+"""
+Política central de las cachés en memoria: entradas máximas, TTL y presupuesto de memoria
+
+Cada función decorada con cache_medido toma su max_entries y su ttl de
+POLITICAS (o de POLITICA_POR_DEFECTO). Además se registra el tamaño estimado
+de cada entrada y su último uso: cuando la suma de todas las cachés supera
+PRESUPUESTO_BYTES se liberan las entradas usadas hace más tiempo, sea cual
+sea su función (LRU global).
+
+Solo usa la biblioteca estándar: la portada no debe cargar pandas ni numpy.
+"""
+import hashlib
+import inspect
+import mmap
+import os
+import sys
+import threading
+import time
+
+# Umbrales de minutos distintos cuyas tablas derivadas se conservan en memoria
+UMBRALES_EN_CACHE = 4
+
+# Funciones que solo dependen de la versión de los datos: la entrada anterior
+# se conserva mientras queden sesiones abiertas con la versión vieja
+POR_VERSION = {'max_entries': 2}
+POR_UMBRAL = {'max_entries': UMBRALES_EN_CACHE}
+# Pools y ponderaciones elegidos en la interfaz: muchas combinaciones posibles
+POR_POOL = {'max_entries': 16, 'ttl': 3600}
+
+POLITICAS = {
+    # El consolidado lo comparten todas las tablas: el presupuesto no lo libera
+    'datos._cargar_datos': {'max_entries': 1, 'expulsable': False},
+    'datos._cargar_ponderacion_competencias': {'max_entries': 1, 'expulsable': False},
+    'catalogo.catalogo_metricas': POR_VERSION,
+    'filtros.indice_filtros': POR_VERSION,
+    'filtros.orden_columna': {'max_entries': 32},
+    # Bytes del CSV completo: solo los últimos pedidos
+    'filtros.csv_filtrado': {'max_entries': 4, 'ttl': 600},
+    'jugadores.indice_jugadores': POR_VERSION,
+    'similares.indice_similitud': POR_UMBRAL,
+    'percentiles.orden_metricas': POR_VERSION,
+    'percentiles.calcular_cubo_percentiles': POR_UMBRAL,
+    'percentiles.calcular_percentiles_variables': POR_UMBRAL,
+    'percentiles.calcular_indices_ecdf': POR_UMBRAL,
+    'percentiles.calcular_ecdf_pool': POR_POOL,
+    'scores.percentiles_scores': POR_UMBRAL,
+    'scores.calcular_scores': POR_UMBRAL,
+    'scores.indice_filtros_scores': POR_UMBRAL,
+    'scores.scores_pool': POR_POOL,
+    'zscores.calcular_zscores_competencia': {'max_entries': 32, 'ttl': 3600},
+    'recursos._imagen_redimensionada': {'max_entries': 16},
+}
+POLITICA_POR_DEFECTO = {'max_entries': 8, 'ttl': 3600}
+
+# SCOUTING_CACHE_MB cambia el presupuesto de memoria de todas las cachés juntas
+PRESUPUESTO_BYTES = int(float(os.environ.get('SCOUTING_CACHE_MB', 1024)) * 1024 * 1024)
+
+_bloqueo = threading.Lock()
+_funciones = {}  # {función: (función cacheada, política, firma)}
+_entradas = {}  # {(función, clave de argumentos): EntradaCache}
+_expulsiones = {}  # {función: entradas liberadas por el presupuesto}
+
+
+def politica(nombre):
+    """
+    {'max_entries', 'ttl', 'expulsable'} de la función `nombre` ('módulo.función')
+    """
+    return {'ttl': None, 'expulsable': True, **POLITICA_POR_DEFECTO, **POLITICAS.get(nombre, {})}
+
+
+class EntradaCache:
+    """
+    Argumentos, tamaño estimado y tiempos de una entrada de caché
+    """
+
+    def __init__(self, args, kwargs, memoria, mapeado):
+        self.args = args
+        self.kwargs = kwargs
+        self.memoria = memoria
+        self.mapeado = mapeado
+        self.creada = self.usada = time.monotonic()
+
+
+def tamano_bytes(valor):
+    """
+    (bytes en memoria, bytes con memory-map) estimados de `valor`.
+
+    Arrays por nbytes (más los objetos de los arrays de texto), DataFrames por
+    memory_usage(deep=True) y contenedores y atributos de forma recursiva. Lo
+    compartido dentro de `valor` cuenta una vez; los arrays abiertos con
+    memory-map desde la caché en disco se cuentan aparte, no ocupan el heap.
+    """
+    vistos = set()
+    totales = [0, 0]
+
+    def sumar(objeto):
+        if id(objeto) in vistos:
+            return
+        vistos.add(id(objeto))
+
+        uso = getattr(objeto, 'memory_usage', None)
+        if callable(uso):
+            uso = uso(deep=True)
+            totales[0] += int(uso.sum() if hasattr(uso, 'sum') else uso)
+            return
+        if hasattr(objeto, 'nbytes') and hasattr(objeto, 'dtype'):
+            totales[1 if _es_mapeado(objeto) else 0] += int(objeto.nbytes)
+            if objeto.dtype.kind == 'O':
+                totales[0] += sum(sys.getsizeof(elemento) for elemento in objeto.ravel().tolist())
+            return
+
+        totales[0] += sys.getsizeof(objeto)
+        if isinstance(objeto, dict):
+            for clave, elemento in objeto.items():
+                sumar(clave)
+                sumar(elemento)
+        elif isinstance(objeto, (list, tuple, set, frozenset)):
+            for elemento in objeto:
+                sumar(elemento)
+        elif hasattr(objeto, '__dict__') and not isinstance(objeto, type):
+            sumar(vars(objeto))
+
+    sumar(valor)
+    return tuple(totales)
+
+
+def _es_mapeado(array):
+    base = array
+    while base is not None:
+        if isinstance(base, mmap.mmap):
+            return True
+        base = getattr(base, 'base', None)
+    return False
+
+
+def declarar(nombre, cacheada, politica_funcion, funcion):
+    with _bloqueo:
+        _funciones[nombre] = (cacheada, politica_funcion, inspect.signature(funcion))
+
+
+def _clave(nombre, args, kwargs):
+    # Por nombre de parámetro, como la clave de Streamlit: f(v, 450) y f(v, minutos_minimos=450) son la misma
+    try:
+        argumentos = _funciones[nombre][2].bind_partial(*args, **kwargs).arguments
+    except (KeyError, TypeError):
+        argumentos = dict(enumerate(args), **kwargs)
+    return nombre, repr(sorted(
+        ((parametro, _resumen_argumento(valor)) for parametro, valor in argumentos.items()),
+        key=lambda item: str(item[0])
+    ))
+
+
+def _resumen_argumento(valor):
+    # El repr de un array grande se trunca con '...': dos máscaras distintas darían la misma clave
+    if hasattr(valor, 'tobytes') and hasattr(valor, 'dtype'):
+        contenido = valor.tobytes() if valor.flags.c_contiguous else valor.copy().tobytes()
+        return f'array{valor.shape}:{hashlib.blake2b(contenido, digest_size=8).hexdigest()}'
+    return valor
+
+
+def registrar(nombre, args, kwargs, valor):
+    """
+    Apunta la entrada recién calculada (en un fallo de caché) con su tamaño
+    """
+    memoria, mapeado = tamano_bytes(valor)
+    clave = _clave(nombre, args, kwargs)
+    with _bloqueo:
+        _entradas[clave] = EntradaCache(args, kwargs, memoria, mapeado)
+        # Streamlit ya ha liberado la entrada menos usada al pasar de max_entries
+        limite = _funciones[nombre][1]['max_entries'] if nombre in _funciones else None
+        propias = [c for c in _entradas if c[0] == nombre]
+        if limite is not None and len(propias) > limite:
+            for c in sorted(propias, key=lambda c: _entradas[c].usada)[:len(propias) - limite]:
+                del _entradas[c]
+
+
+def usar(nombre, args, kwargs):
+    """
+    Marca la entrada como usada ahora (en cada llamada, acierto o fallo)
+    """
+    clave = _clave(nombre, args, kwargs)
+    with _bloqueo:
+        entrada = _entradas.get(clave)
+        if entrada is not None:
+            entrada.usada = time.monotonic()
+
+
+def olvidar(nombre=None, args=(), kwargs=None):
+    """
+    Quita del registro una entrada, todas las de una función o todas (tras un .clear())
+    """
+    with _bloqueo:
+        if nombre is None:
+            _entradas.clear()
+        elif args or kwargs:
+            _entradas.pop(_clave(nombre, args, kwargs or {}), None)
+        else:
+            for clave in [c for c in _entradas if c[0] == nombre]:
+                del _entradas[clave]
+
+
+def _caducar():
+    # Las entradas con TTL vencido ya no las devolverá Streamlit (se recalculan en la siguiente llamada)
+    ahora = time.monotonic()
+    for clave in list(_entradas):
+        ttl = _funciones[clave[0]][1]['ttl'] if clave[0] in _funciones else None
+        if ttl is not None and ahora - _entradas[clave].creada > ttl:
+            del _entradas[clave]
+
+
+def memoria_total():
+    with _bloqueo:
+        _caducar()
+        return sum(entrada.memoria for entrada in _entradas.values())
+
+
+def aplicar_presupuesto():
+    """
+    Libera las entradas usadas hace más tiempo hasta volver a PRESUPUESTO_BYTES.
+
+    La entrada usada más recientemente nunca se libera (la está usando la
+    ejecución en curso), ni las de funciones con 'expulsable': False.
+    """
+    with _bloqueo:
+        _caducar()
+        total = sum(entrada.memoria for entrada in _entradas.values())
+        if total <= PRESUPUESTO_BYTES:
+            return
+        candidatas = sorted(
+            (clave for clave in _entradas if clave[0] in _funciones and _funciones[clave[0]][1]['expulsable']),
+            key=lambda clave: _entradas[clave].usada
+        )
+        reciente = max(_entradas, key=lambda clave: _entradas[clave].usada)
+        liberar = []
+        for clave in candidatas:
+            if total <= PRESUPUESTO_BYTES:
+                break
+            if clave == reciente:
+                continue
+            entrada = _entradas.pop(clave)
+            total -= entrada.memoria
+            liberar.append((clave[0], entrada))
+            _expulsiones[clave[0]] = _expulsiones.get(clave[0], 0) + 1
+
+    # Fuera del bloqueo: clear toma el bloqueo de la caché de Streamlit
+    for nombre, entrada in liberar:
+        cacheada = _funciones[nombre][0]
+        try:
+            cacheada.clear(*entrada.args, **entrada.kwargs)
+        except TypeError:
+            # Streamlit sin clear(*args): se vacía la función entera
+            cacheada.clear()
+            olvidar(nombre)
+
+
+def resumen():
+    """
+    [{función, política, entradas, bytes, expulsiones}] de las funciones declaradas
+    """
+    with _bloqueo:
+        _caducar()
+        filas = []
+        for nombre, (_, politica_funcion, _) in sorted(_funciones.items()):
+            entradas = [entrada for clave, entrada in _entradas.items() if clave[0] == nombre]
+            filas.append({
+                'funcion': nombre,
+                'max_entries': politica_funcion['max_entries'],
+                'ttl': politica_funcion['ttl'],
+                'expulsable': politica_funcion['expulsable'],
+                'entradas': len(entradas),
+                'memoria': sum(entrada.memoria for entrada in entradas),
+                'mapeado': sum(entrada.mapeado for entrada in entradas),
+                'expulsiones': _expulsiones.get(nombre, 0),
+            })
+        return filas
+
+
+def entradas():
+    """
+    [{función, argumentos, bytes, segundos desde que se creó y desde su último uso}]
+    """
+    ahora = time.monotonic()
+    with _bloqueo:
+        _caducar()
+        return [
+            {
+                'funcion': nombre,
+                'argumentos': argumentos,
+                'memoria': entrada.memoria,
+                'mapeado': entrada.mapeado,
+                'edad': ahora - entrada.creada,
+                'sin_usar': ahora - entrada.usada,
+            }
+            for (nombre, argumentos), entrada in sorted(_entradas.items(), key=lambda item: -item[1].memoria)
+        ]
+
+
+def rss_proceso():
+    """
+    Memoria residente del proceso en bytes (None si el sistema no la expone)
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
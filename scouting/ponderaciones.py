@@ -0,0 +1,77 @@
+"""
+Presets de ponderaciones de métricas y competencias para la Búsqueda Por Perfil
+"""
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo el bloqueo entre hilos del proceso
+    fcntl = None
+
+from scouting.datos import RAIZ
+
+# Datos de usuario, fuera de git; SCOUTING_PRESETS permite guardarlos en otro sitio
+RUTA_PRESETS = Path(os.environ.get('SCOUTING_PRESETS', RAIZ / 'presets_ponderaciones.json'))
+RUTA_BLOQUEO_PRESETS = RUTA_PRESETS.with_name(RUTA_PRESETS.name + '.lock')
+
+_bloqueo_hilos = threading.Lock()
+
+PRESET_DICCIONARIO = 'Diccionario'
+
+
+def cargar_presets():
+    """
+    {nombre: {'metricas': {metrica: peso}, 'competencias': {competencia: peso}}}
+    (vacío si no hay fichero o no se puede leer)
+    """
+    try:
+        with open(RUTA_PRESETS, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@contextmanager
+def _bloqueo_presets():
+    """
+    Bloqueo exclusivo del fichero de presets entre hilos y procesos
+    """
+    RUTA_PRESETS.parent.mkdir(parents=True, exist_ok=True)
+    with _bloqueo_hilos, open(RUTA_BLOQUEO_PRESETS, 'a') as bloqueo:
+        if fcntl is not None:
+            fcntl.flock(bloqueo, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(bloqueo, fcntl.LOCK_UN)
+
+
+def guardar_preset(nombre, metricas, competencias):
+    """
+    Añade o sustituye un preset y reescribe el fichero de forma atómica.
+
+    La lectura, la mezcla y la escritura se hacen bajo el bloqueo, así que dos
+    sesiones que guardan a la vez no pierden los presets de la otra.
+    """
+    with _bloqueo_presets():
+        presets = cargar_presets()
+        presets[nombre] = {
+            'metricas': {metrica: float(peso) for metrica, peso in metricas.items()},
+            'competencias': {competencia: float(peso) for competencia, peso in competencias.items()},
+        }
+
+        fd, temporal = tempfile.mkstemp(dir=RUTA_PRESETS.parent, suffix='.json.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(presets, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.chmod(temporal, 0o644)
+            os.replace(temporal, RUTA_PRESETS)
+        finally:
+            if os.path.exists(temporal):
+                os.remove(temporal)
@@ -0,0 +1,92 @@
+"""
+Precálculo offline de todas las tablas derivadas antes de un despliegue
+
+Uso: python -m scouting.precalculo [--procesos N]
+
+Carga los datos una vez, genera el artefacto Parquet del consolidado, el cubo
+de percentiles, los scores y las matrices de Z-Score por competencia del pool
+por defecto del Perfil Individual, y los deja en la caché en disco que las
+páginas abren al arrancar.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import streamlit.logger
+
+# Fuera de Streamlit las cachés avisan de que no hay sesión al definirse y en cada llamada
+streamlit.logger.set_log_level('error')
+
+from scouting.cache_disco import DIRECTORIO_CACHE
+from scouting.datos import MINUTOS_MINIMOS, load_data, version_datos
+from scouting.percentiles import calcular_cubo_percentiles
+from scouting.scores import calcular_scores
+from scouting.zscores import zscores_en_disco
+
+
+def pool_por_defecto(df):
+    """
+    Filtros iniciales de la barra lateral del Perfil Individual
+    """
+    competencias = sorted(df['Competencia'].unique())
+    temporadas = sorted(df['Temporada'].unique(), reverse=True)
+    edad_range = (int(df['age'].min()), int(df['age'].max())) if 'age' in df.columns else None
+    return MINUTOS_MINIMOS, competencias, temporadas, edad_range
+
+
+def _zscores_competencias(version, pool, competencias):
+    # Se ejecuta en un proceso del pool: cada uno escribe sus artefactos en disco
+    for competencia in competencias:
+        zscores_en_disco(version, *pool, competencia)
+    return len(competencias)
+
+
+def precalcular(procesos=None):
+    """
+    Construye todos los artefactos y devuelve los tiempos de cada etapa en segundos
+    """
+    tiempos = {}
+
+    def etapa(nombre, funcion):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos[nombre] = time.perf_counter() - inicio
+        print(f'{nombre:<12} {tiempos[nombre]:8.2f} s', flush=True)
+        return resultado
+
+    version = etapa('version', version_datos)
+    df, _ = etapa('datos', lambda: load_data(version))
+    # El cubo y los scores son una sola pasada vectorizada sobre todo el consolidado
+    etapa('percentiles', lambda: calcular_cubo_percentiles(version, MINUTOS_MINIMOS))
+    etapa('scores', lambda: calcular_scores(version, MINUTOS_MINIMOS))
+
+    pool = pool_por_defecto(df)
+    competencias = sorted(df['Competencia'].unique())
+    procesos = procesos or os.cpu_count() or 1
+    # Reparto round-robin: un lote de competencias por proceso
+    lotes = [competencias[i::procesos] for i in range(procesos) if competencias[i::procesos]]
+
+    def zscores():
+        with ProcessPoolExecutor(max_workers=len(lotes)) as executor:
+            futuros = [executor.submit(_zscores_competencias, version, pool, lote) for lote in lotes]
+            return sum(futuro.result() for futuro in futuros)
+
+    etapa('zscores', zscores)
+    return version, tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--procesos', type=int, default=None,
+                        help='procesos para las matrices de Z-Score (por defecto, uno por CPU)')
+    args = parser.parse_args()
+
+    version, tiempos = precalcular(args.procesos)
+    n_artefactos = len([ruta for ruta in DIRECTORIO_CACHE.glob(f'*-{version}-*')])
+    print(f'{"total":<12} {sum(tiempos.values()):8.2f} s')
+    print(f'Versión {version}: {n_artefactos} artefactos en {DIRECTORIO_CACHE}')
+
+
+if __name__ == '__main__':
+    main()
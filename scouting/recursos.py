@@ -0,0 +1,41 @@
+"""
+Imágenes estáticas de la app, decodificadas y redimensionadas una vez por proceso
+"""
+import io
+from pathlib import Path
+
+import streamlit as st
+
+from scouting.rendimiento import cache_medido
+
+# Sin importar scouting.datos: la portada no debe cargar pandas
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def imagen(nombre, ancho_maximo):
+    """
+    Bytes de la imagen `nombre` (relativa a la raíz) con como mucho
+    `ancho_maximo` píxeles de ancho, listos para st.image sin re-codificar
+    en cada ejecución. Se invalida al cambiar el fichero.
+    """
+    ruta = RAIZ / nombre
+    return _imagen_redimensionada(str(ruta), ruta.stat().st_mtime_ns, ancho_maximo)
+
+
+@cache_medido(st.cache_resource)
+def _imagen_redimensionada(ruta, mtime_ns, ancho_maximo):
+    from PIL import Image
+
+    with Image.open(ruta) as original:
+        if original.width <= ancho_maximo:
+            return Path(ruta).read_bytes()
+        alto = round(original.height * ancho_maximo / original.width)
+        formato = original.format
+        reducida = original.resize((ancho_maximo, alto), Image.LANCZOS)
+
+    salida = io.BytesIO()
+    if formato == 'JPEG':
+        reducida.save(salida, format='JPEG', quality=85, optimize=True)
+    else:
+        reducida.save(salida, format='PNG', optimize=True)
+    return salida.getvalue()
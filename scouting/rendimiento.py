@@ -0,0 +1,379 @@
+"""
+Tiempos por etapa y aciertos de caché de cada ejecución de una página
+
+Uso en una página:
+
+    iniciar_pagina("Perfil Individual")
+    with medir('carga'):
+        ...
+    cerrar_pagina()
+
+Las partes de la página que se re-ejecutan solas se declaran con
+@fragmento('nombre'): en la ejecución completa son una etapa más y en sus
+reruns parciales se registran como '<página> / <nombre>'.
+
+Con ?debug=1 en la URL se muestra el desglose en la barra lateral. Cada
+ejecución se añade además a un JSONL rotado (logs/rendimiento.jsonl) del que
+`python -m scouting.rendimiento` saca p50/p95 por página y etapa.
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+import streamlit as st
+
+from scouting import politica_cache
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# SCOUTING_LOG_RENDIMIENTO cambia el fichero del log; vacío lo desactiva
+RUTA_LOG = os.environ.get('SCOUTING_LOG_RENDIMIENTO', str(RAIZ / 'logs' / 'rendimiento.jsonl'))
+BYTES_POR_LOG = 5 * 1024 * 1024
+LOGS_ROTADOS = 5
+
+PARAMETRO_DEBUG = 'debug'
+
+# Etapa con el tiempo de la página no cubierto por ninguna etapa de primer nivel
+ETAPA_SIN_MEDIR = 'sin medir'
+
+_hilo = threading.local()
+_bloqueo = threading.Lock()
+
+# Contadores de todo el proceso: {función: {'llamadas': n, 'fallos': n}}
+_contadores_cache = defaultdict(lambda: {'llamadas': 0, 'fallos': 0})
+
+# Listas que reciben cada registro cerrado (ver registros_capturados)
+_oyentes = []
+
+
+class MedicionPagina:
+    """
+    Etapas y llamadas a funciones cacheadas de una ejecución de la página
+    """
+
+    def __init__(self, pagina):
+        self.pagina = pagina
+        self.inicio = time.perf_counter()
+        self.total = None
+        self.nivel = 0
+        self.etapas = []  # [(nombre, nivel, segundos)] en orden de finalización
+        self.cache = defaultdict(lambda: {'llamadas': 0, 'fallos': 0, 'segundos': 0.0})
+
+    def etapas_agregadas(self):
+        """
+        {etapa: segundos} sumando las repeticiones, más el tiempo sin medir
+        """
+        agregadas = defaultdict(float)
+        for nombre, _, segundos in self.etapas:
+            agregadas[nombre] += segundos
+        if self.total is not None:
+            medido = sum(segundos for _, nivel, segundos in self.etapas if nivel == 0)
+            agregadas[ETAPA_SIN_MEDIR] = max(self.total - medido, 0.0)
+        return dict(agregadas)
+
+    def registro(self):
+        return {
+            'fecha': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'pagina': self.pagina,
+            'total': self.total,
+            'etapas': self.etapas_agregadas(),
+            'cache': {funcion: dict(datos) for funcion, datos in self.cache.items()},
+        }
+
+
+def medicion_actual():
+    """
+    Medición de la ejecución en curso en este hilo (None fuera de una página)
+    """
+    return getattr(_hilo, 'medicion', None)
+
+
+def iniciar_pagina(pagina):
+    """
+    Empieza a medir la ejecución actual de la página
+    """
+    _hilo.pagina = pagina
+    _hilo.medicion = MedicionPagina(pagina)
+    return _hilo.medicion
+
+
+@contextmanager
+def medir(etapa):
+    """
+    Cronometra el bloque como `etapa` de la página en curso (sin efecto fuera de una página)
+    """
+    medicion = medicion_actual()
+    if medicion is None:
+        yield
+        return
+    nivel = medicion.nivel
+    medicion.nivel += 1
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicion.nivel = nivel
+        medicion.etapas.append((etapa, nivel, time.perf_counter() - inicio))
+
+
+def fragmento(nombre):
+    """
+    st.fragment medido: un cambio en sus widgets solo re-ejecuta la función.
+
+    Los widgets deben estar en el cuerpo de la función (un fragmento no puede
+    escribir en la barra lateral); lo que dependa de widgets de fuera se pasa
+    como argumento y se conserva entre reruns parciales.
+    """
+    def envolver(funcion):
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            if medicion_actual() is not None:
+                # Parte de la ejecución completa de la página
+                with medir(nombre):
+                    return funcion(*args, **kwargs)
+            _hilo.medicion = MedicionPagina(f"{getattr(_hilo, 'pagina', '?')} / {nombre}")
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                cerrar_pagina(panel=False)
+
+        return st.fragment(medida)
+
+    return envolver
+
+
+def cache_medido(decorador):
+    """
+    Aplica un decorador de caché de Streamlit con la política central de la
+    función (scouting.politica_cache), contando llamadas y fallos.
+
+    Uso: @cache_medido(st.cache_resource) o @cache_medido(st.cache_data); el
+    max_entries y el ttl salen de POLITICAS según 'módulo.función'. El cuerpo
+    de la función solo se ejecuta en un fallo, así que los fallos (y el tamaño
+    de la entrada nueva) se apuntan dentro y las llamadas fuera.
+    """
+    def envolver(funcion):
+        nombre = f'{funcion.__module__.rsplit(".", 1)[-1]}.{funcion.__name__}'
+        politica = politica_cache.politica(nombre)
+
+        @functools.wraps(funcion)
+        def cuerpo(*args, **kwargs):
+            _contar(nombre, 'fallos')
+            valor = funcion(*args, **kwargs)
+            politica_cache.registrar(nombre, args, kwargs, valor)
+            return valor
+
+        cacheada = decorador(max_entries=politica['max_entries'], ttl=politica['ttl'])(cuerpo)
+        politica_cache.declarar(nombre, cacheada, politica, funcion)
+
+        @functools.wraps(funcion)
+        def llamada(*args, **kwargs):
+            _contar(nombre, 'llamadas')
+            fallos = _contadores_cache[nombre]['fallos']
+            inicio = time.perf_counter()
+            try:
+                return cacheada(*args, **kwargs)
+            finally:
+                politica_cache.usar(nombre, args, kwargs)
+                if _contadores_cache[nombre]['fallos'] != fallos:
+                    # Entrada nueva: fuera del cálculo cacheado, por si hay que liberar otras
+                    politica_cache.aplicar_presupuesto()
+                medicion = medicion_actual()
+                if medicion is not None:
+                    medicion.cache[nombre]['segundos'] += time.perf_counter() - inicio
+
+        def vaciar(*args, **kwargs):
+            cacheada.clear(*args, **kwargs)
+            politica_cache.olvidar(nombre, args, kwargs)
+
+        llamada.clear = vaciar
+        return llamada
+
+    return envolver
+
+
+def _contar(nombre, campo):
+    with _bloqueo:
+        _contadores_cache[nombre][campo] += 1
+    medicion = medicion_actual()
+    if medicion is not None:
+        medicion.cache[nombre][campo] += 1
+
+
+def contadores_cache():
+    """
+    Copia de los contadores de caché acumulados por el proceso
+    """
+    with _bloqueo:
+        return {funcion: dict(datos) for funcion, datos in _contadores_cache.items()}
+
+
+_logger = None
+
+
+def _log():
+    global _logger
+    if _logger is None and RUTA_LOG:
+        with _bloqueo:
+            if _logger is None:
+                logger = logging.getLogger('scouting.rendimiento')
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                try:
+                    Path(RUTA_LOG).parent.mkdir(parents=True, exist_ok=True)
+                    manejador = RotatingFileHandler(
+                        RUTA_LOG, maxBytes=BYTES_POR_LOG, backupCount=LOGS_ROTADOS, encoding='utf-8'
+                    )
+                except OSError:
+                    manejador = logging.NullHandler()
+                manejador.setFormatter(logging.Formatter('%(message)s'))
+                logger.addHandler(manejador)
+                _logger = logger
+    return _logger
+
+
+@contextmanager
+def registros_capturados():
+    """
+    Lista que recibe el registro de cada medición cerrada (en cualquier hilo)
+    mientras dura el bloque, con o sin log; la usa el benchmark de páginas
+    """
+    registros = []
+    with _bloqueo:
+        _oyentes.append(registros)
+    try:
+        yield registros
+    finally:
+        with _bloqueo:
+            _oyentes.remove(registros)
+
+
+def modo_debug():
+    valor = st.query_params.get(PARAMETRO_DEBUG, '')
+    return valor.lower() not in ('', '0', 'false', 'no')
+
+
+def cerrar_pagina(panel=True):
+    """
+    Cierra la medición en curso: la añade al log y, con ?debug=1, muestra el panel
+    (no en los reruns de un fragmento, que no pueden escribir en la barra lateral)
+    """
+    medicion = medicion_actual()
+    if medicion is None:
+        return
+    _hilo.medicion = None
+    medicion.total = time.perf_counter() - medicion.inicio
+
+    registro = medicion.registro()
+    logger = _log()
+    if logger is not None:
+        logger.info(json.dumps(registro, ensure_ascii=False))
+    with _bloqueo:
+        for registros in _oyentes:
+            registros.append(registro)
+
+    if panel and modo_debug():
+        mostrar_panel(medicion)
+
+
+def mostrar_panel(medicion):
+    """
+    Desglose de la ejecución en un expander de la barra lateral
+    """
+    import pandas as pd
+
+    with st.sidebar.expander(f"⏱️ Rendimiento: {medicion.total * 1000:.0f} ms", expanded=False):
+        etapas = medicion.etapas_agregadas()
+        st.dataframe(
+            pd.DataFrame({'Etapa': list(etapas), 'ms': [s * 1000 for s in etapas.values()]}),
+            hide_index=True,
+            column_config={'ms': st.column_config.NumberColumn('ms', format='%.1f')}
+        )
+
+        totales = contadores_cache()
+        filas = [
+            {
+                'Función': funcion,
+                'Aciertos': datos['llamadas'] - datos['fallos'],
+                'Fallos': datos['fallos'],
+                'ms': datos['segundos'] * 1000,
+                'Aciertos (proceso)': totales[funcion]['llamadas'] - totales[funcion]['fallos'],
+                'Fallos (proceso)': totales[funcion]['fallos'],
+            }
+            for funcion, datos in medicion.cache.items()
+        ]
+        if filas:
+            st.dataframe(
+                pd.DataFrame(filas),
+                hide_index=True,
+                column_config={'ms': st.column_config.NumberColumn('ms', format='%.1f')}
+            )
+
+
+def leer_log(ruta=RUTA_LOG):
+    """
+    Registros del log y de sus rotaciones, del más antiguo al más reciente
+    """
+    ruta = Path(ruta)
+    ficheros = [ruta.with_name(f'{ruta.name}.{i}') for i in range(LOGS_ROTADOS, 0, -1)] + [ruta]
+    registros = []
+    for fichero in ficheros:
+        if not fichero.exists():
+            continue
+        with open(fichero, encoding='utf-8') as f:
+            for linea in f:
+                try:
+                    registros.append(json.loads(linea))
+                except ValueError:
+                    continue
+    return registros
+
+
+def percentiles_log(registros):
+    """
+    {página: {etapa: (n, p50, p95)}} en milisegundos, con el total de la página como etapa 'total'
+    """
+    import numpy as np
+
+    muestras = defaultdict(lambda: defaultdict(list))
+    for registro in registros:
+        pagina = muestras[registro['pagina']]
+        if registro.get('total') is not None:
+            pagina['total'].append(registro['total'])
+        for etapa, segundos in registro.get('etapas', {}).items():
+            pagina[etapa].append(segundos)
+    return {
+        pagina: {
+            etapa: (len(valores), *(np.percentile(valores, [50, 95]) * 1000))
+            for etapa, valores in etapas.items()
+        }
+        for pagina, etapas in muestras.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='p50/p95 por página y etapa a partir del log de rendimiento')
+    parser.add_argument('log', nargs='?', default=RUTA_LOG)
+    args = parser.parse_args()
+
+    resumen = percentiles_log(leer_log(args.log))
+    if not resumen:
+        print(f'Sin registros en {args.log}')
+        return
+    for pagina, etapas in sorted(resumen.items()):
+        print(pagina)
+        for etapa, (n, p50, p95) in sorted(etapas.items(), key=lambda item: -item[1][1]):
+            print(f'  {etapa:<24} n={n:<6} p50 {p50:9.1f} ms   p95 {p95:9.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
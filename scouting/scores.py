@@ -0,0 +1,272 @@
+"""
+Motor vectorizado de scores por categoría y global
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from scouting.cache_disco import derivado_en_disco
+from scouting.datos import load_data, load_ponderacion_competencias
+from scouting.filtros import COLUMNAS_CATEGORICAS, COLUMNAS_RANGO, IndiceFiltros, indice_filtros
+from scouting.percentiles import orden_metricas
+from scouting.rendimiento import cache_medido
+
+COLUMNAS_BASE_SCORES = ['jugador', 'TeamName', 'Competencia', 'Temporada', 'age', 'height', 'weight', 'minutos_totales']
+
+
+@dataclass(frozen=True)
+class PesosCategorias:
+    """
+    Matriz métrica x categoría con las ponderaciones del diccionario
+    """
+    metricas: list
+    categorias: list
+    pesos: np.ndarray  # (n_metricas, n_categorias)
+    signo: np.ndarray  # -1 para métricas invertidas (mayor valor = peor), 1 en otro caso
+
+    @property
+    def columnas_score(self):
+        return [f'Score_{categoria.replace(" ", "_")}' for categoria in self.categorias]
+
+
+def construir_pesos(diccionario, columnas, ponderaciones=None):
+    """
+    Convierte el diccionario en la matriz de pesos métrica x categoría.
+
+    Solo se incluyen las métricas presentes en `columnas`; la categoría 'Otras' se excluye.
+    `ponderaciones` ({metrica: peso}) sustituye la Ponderacion del diccionario
+    de las métricas que contiene.
+    """
+    categorias = [cat for cat in diccionario['categoria'].dropna().unique() if cat.lower() != 'otras']
+    en_datos = diccionario['metrica'].isin(columnas) & diccionario['categoria'].isin(categorias)
+    dicc = diccionario[en_datos]
+
+    metricas = list(dict.fromkeys(dicc['metrica']))
+    fila = {metrica: i for i, metrica in enumerate(metricas)}
+    columna = {categoria: j for j, categoria in enumerate(categorias)}
+
+    pesos = np.zeros((len(metricas), len(categorias)))
+    signo = np.ones(len(metricas))
+    ponderaciones_dicc = dicc['Ponderacion'].fillna(1).to_numpy(dtype=float)
+    invertir = dicc['Invertir'].fillna(False).astype(bool).to_numpy()
+    for metrica, categoria, ponderacion, inv in zip(dicc['metrica'], dicc['categoria'], ponderaciones_dicc, invertir):
+        if ponderaciones is not None:
+            ponderacion = ponderaciones.get(metrica, ponderacion)
+        pesos[fila[metrica], columna[categoria]] += ponderacion
+        if inv:
+            signo[fila[metrica]] = -1.0
+
+    return PesosCategorias(metricas, categorias, pesos, signo)
+
+
+def vector_ponderacion_competencia(competencias, pond_comp_dict):
+    """
+    Ponderación por competencia de cada fila (1 si la competencia no está en el fichero)
+    """
+    return ponderacion_por_codigo(*pd.factorize(competencias), pond_comp_dict)
+
+
+def ponderacion_por_codigo(codigos, unicas, pond_comp_dict):
+    """
+    Como vector_ponderacion_competencia, con las competencias ya factorizadas
+    """
+    valores = np.array([pond_comp_dict.get(comp, 1) for comp in unicas], dtype=float)
+    return valores[codigos]
+
+
+def scores_desde_percentiles(percentiles, pesos, validas, pond_competencia):
+    """
+    Calcula los scores de categoría y el global a partir de la matriz de percentiles.
+
+    `validas` marca las métricas con algún dato en el pool: las demás no suman
+    ni a los scores ni a la suma de ponderaciones. Devuelve una matriz
+    (n_jugadores, n_categorias + 1) con el Score_Global en la última columna.
+    """
+    matriz = pesos * validas[:, None]
+    suma_ponderaciones = matriz.sum(axis=0)
+    # La media ponderada se normaliza en la matriz de pesos, no fila a fila
+    matriz = np.divide(matriz, suma_ponderaciones, out=np.zeros_like(matriz), where=suma_ponderaciones > 0)
+
+    # Producto en el tipo de los percentiles (float32 en los cacheados: la mitad de memoria
+    # que recorrer) y una fila por categoría, para que cada operación recorra memoria contigua
+    scores = np.ascontiguousarray((percentiles @ matriz.astype(percentiles.dtype, copy=False)).T)
+
+    # Ponderación por competencia y normalización a 0-100
+    scores *= pond_competencia
+    if scores.shape[1]:
+        maximos = scores.max(axis=1)
+        scores *= np.divide(100, maximos, out=np.ones_like(maximos), where=maximos > 0)[:, None]
+
+    # Matriz en orden de columnas: cada score es un array contiguo para filtrar y mostrar
+    resultado = np.zeros((len(scores) + 1, scores.shape[1]))
+    resultado[:-1] = scores
+    if len(scores):
+        np.mean(resultado[:-1], axis=0, out=resultado[-1])
+    return resultado.T
+
+
+@cache_medido(st.cache_resource)
+def percentiles_scores(version, minutos_minimos):
+    """
+    Percentiles globales del pool de `minutos_minimos` listos para puntuar.
+
+    Devuelve (posiciones de las filas que puntúan, matriz de percentiles float32 con
+    0 en lugar de NaN, métricas con algún dato, (códigos, competencias) de
+    pd.factorize de las filas que puntúan), en el orden de construir_pesos.
+    No dependen de las ponderaciones, así que se comparten entre re-ponderaciones.
+    """
+    df, diccionario = load_data(version)
+    metricas = construir_pesos(diccionario, df.columns).metricas
+
+    # Solo puntúan los jugadores con el mínimo de minutos
+    mascara = (df['minutos_totales'] >= minutos_minimos).to_numpy()
+
+    # Mismos valores que la capa global del cubo, sin ordenar de nuevo para cada umbral
+    percentiles = orden_metricas(version).percentiles_pool(mascara, metricas)
+    validas = ~np.isnan(percentiles).all(axis=0)
+    percentiles = np.ascontiguousarray(np.nan_to_num(percentiles, nan=0.0), dtype=np.float32)
+    codigos, competencias = pd.factorize(df['Competencia'][mascara])
+    filas = np.flatnonzero(mascara)
+    for array in (filas, percentiles, validas, codigos):
+        array.flags.writeable = False
+    return filas, percentiles, validas, (codigos, competencias)
+
+
+def puntuar(version, pesos, pond_comp_dict, minutos_minimos):
+    """
+    Matriz (n_filas, n_categorias + 1) de scores para unas ponderaciones dadas.
+
+    Es un producto matricial sobre los percentiles cacheados: no se vuelve a
+    calcular ningún rango.
+    """
+    df, _ = load_data(version)
+    filas, percentiles, validas, competencias = percentiles_scores(version, minutos_minimos)
+    pond_competencia = ponderacion_por_codigo(*competencias, pond_comp_dict)
+
+    scores = np.zeros((len(pesos.categorias) + 1, len(df))).T
+    scores[filas] = scores_desde_percentiles(percentiles, pesos.pesos, validas, pond_competencia)
+    return scores
+
+
+def tabla_scores(df, columnas, scores, filas=None):
+    """
+    Columnas base de df (solo `filas` si se indican) con las columnas de scores
+    """
+    if filas is None:
+        df_scores = df[COLUMNAS_BASE_SCORES].copy()
+    else:
+        df_scores = df.iloc[filas, df.columns.get_indexer(COLUMNAS_BASE_SCORES)]
+    for j, col_name in enumerate(columnas):
+        df_scores[col_name] = scores[:, j]
+    return df_scores
+
+
+@cache_medido(st.cache_resource)
+def calcular_scores(version, minutos_minimos):
+    """
+    Calcula scores por categoría y global usando percentiles ponderados dentro
+    del pool de `minutos_minimos` (las filas por debajo puntúan 0).
+
+    La tabla es compartida (como load_data): se filtra y se selecciona, nunca se modifica.
+    """
+    df, diccionario = load_data(version)
+    pesos = construir_pesos(diccionario, df.columns)
+
+    def calcular():
+        return {'scores': puntuar(version, pesos, load_ponderacion_competencias(version), minutos_minimos)}
+
+    config = (minutos_minimos, pesos.metricas, pesos.categorias, pesos.pesos, pesos.signo)
+    scores = derivado_en_disco('scores', version, config, calcular)['scores']
+    return tabla_scores(df, pesos.columnas_score + ['Score_Global'], scores)
+
+
+class ScoresPersonalizados:
+    """
+    Scores de todas las filas del consolidado sin tabla propia: se filtran con
+    el índice de filtros cacheado del consolidado y se unen a las columnas base
+    solo para las filas que se muestran.
+    """
+
+    def __init__(self, version, columnas, scores):
+        self.version = version
+        self.columnas = list(columnas)
+        self.scores = scores
+        self.posicion = {columna: j for j, columna in enumerate(self.columnas)}
+
+    def filas(self, rangos=None, categorias=None, incluir_nulos=()):
+        """
+        Posiciones de las filas que cumplen todos los filtros (mismos argumentos
+        que IndiceFiltros.filas; los rangos de las columnas Score_* incluidos)
+        """
+        rangos = rangos or {}
+        rangos_base = {columna: rango for columna, rango in rangos.items() if columna not in self.posicion}
+        mascara = indice_filtros(self.version).mascara(rangos_base, categorias, incluir_nulos)
+        for columna, (minimo, maximo) in rangos.items():
+            if columna in self.posicion:
+                valores = self.scores[:, self.posicion[columna]]
+                mascara &= (valores >= minimo) & (valores <= maximo)
+        return np.flatnonzero(mascara)
+
+    def tabla(self, filas):
+        """
+        Tabla de scores (columnas base + Score_*) de `filas`
+        """
+        df, _ = load_data(self.version)
+        return tabla_scores(df, self.columnas, self.scores[filas], filas)
+
+
+def scores_personalizados(version, ponderaciones, pond_comp_dict, minutos_minimos):
+    """
+    ScoresPersonalizados con ponderaciones de métricas y competencias de la sesión (sin caché)
+    """
+    df, diccionario = load_data(version)
+    pesos = construir_pesos(diccionario, df.columns, ponderaciones)
+    scores = puntuar(version, pesos, pond_comp_dict, minutos_minimos)
+    return ScoresPersonalizados(version, pesos.columnas_score + ['Score_Global'], scores)
+
+
+@cache_medido(st.cache_resource)
+def scores_pool(version, rangos, categorias, incluir_nulos=(), ponderaciones=None, pond_comp_dict=None):
+    """
+    Tabla de scores recalculada contra el pool que definen los filtros, en lugar
+    del pool global de minutos mínimos.
+
+    `rangos`, `categorias` e `incluir_nulos` son los de IndiceFiltros.mascara
+    sobre el consolidado; las filas fuera del pool puntúan 0. Reutiliza el orden
+    por métrica cacheado y la matriz de pesos: no se ordena ningún valor por pool. Los
+    últimos pools consultados quedan en memoria (LRU de 16 entradas).
+    """
+    df, diccionario = load_data(version)
+    pesos = construir_pesos(diccionario, df.columns, ponderaciones)
+    if pond_comp_dict is None:
+        pond_comp_dict = load_ponderacion_competencias(version)
+
+    mascara = indice_filtros(version).mascara(rangos, categorias, incluir_nulos)
+    percentiles = orden_metricas(version).percentiles_pool(mascara, pesos.metricas)
+    validas = ~np.isnan(percentiles).all(axis=0)
+    pond_competencia = vector_ponderacion_competencia(df['Competencia'][mascara], pond_comp_dict)
+
+    scores = np.zeros((len(pesos.categorias) + 1, len(df))).T
+    scores[mascara] = scores_desde_percentiles(
+        np.nan_to_num(percentiles, nan=0.0), pesos.pesos, validas, pond_competencia
+    )
+    return tabla_scores(df, pesos.columnas_score + ['Score_Global'], scores)
+
+
+def indice_scores(df_scores):
+    """
+    Índice de filtros sobre una tabla de scores, incluyendo las columnas Score_*
+    """
+    columnas_rango = [col for col in COLUMNAS_RANGO if col in df_scores.columns]
+    columnas_rango += [col for col in df_scores.columns if col.startswith('Score_')]
+    return IndiceFiltros(df_scores, columnas_rango, COLUMNAS_CATEGORICAS)
+
+
+@cache_medido(st.cache_resource)
+def indice_filtros_scores(version, minutos_minimos):
+    """
+    Índice de filtros sobre la tabla de scores por defecto del umbral de minutos
+    """
+    return indice_scores(calcular_scores(version, minutos_minimos))
@@ -0,0 +1,103 @@
+"""
+Búsqueda de porteros similares sobre los vectores de percentiles
+"""
+import numpy as np
+import streamlit as st
+
+from scouting.catalogo import catalogo_metricas
+from scouting.datos import load_data
+from scouting.jugadores import indice_jugadores
+from scouting.percentiles import CONTEXTO_GLOBAL, calcular_cubo_percentiles
+from scouting.rendimiento import cache_medido
+
+DISTANCIA_COSENO = 'coseno'
+DISTANCIA_EUCLIDEA = 'euclidea'
+
+
+class IndiceSimilitud:
+    """
+    Matriz de percentiles (0-100) del pool de minutos mínimos, centrada en la
+    mediana, para consultar los k vecinos más cercanos de un jugador con una
+    sola operación matricial.
+
+    Con coseno se compara la forma del perfil (qué métricas están por encima o
+    por debajo de la mediana); con euclídea, además, la magnitud.
+
+    `claves` son las claves de jugador de `filas`: un candidato con la misma
+    clave que la referencia es el mismo portero y nunca se devuelve.
+    """
+
+    def __init__(self, percentiles, filas, claves, metricas, categoria_metrica):
+        self.filas = np.asarray(filas)
+        self.claves = np.asarray(claves)
+        self.posicion = {fila: i for i, fila in enumerate(self.filas)}
+        self.metricas = list(metricas)
+        self.categorias = list(dict.fromkeys(categoria_metrica))
+        self.codigo_categoria = np.array([self.categorias.index(cat) for cat in categoria_metrica])
+
+        self.vectores = np.asarray(percentiles, dtype=float) - 50
+        self.vectores.flags.writeable = False
+
+    def pesos_metricas(self, pesos_categoria=None):
+        """
+        Peso de cada métrica a partir de {categoria: peso} (1 para las no indicadas)
+        """
+        if not pesos_categoria:
+            return np.ones(len(self.metricas))
+        pesos = np.array([float(pesos_categoria.get(cat, 1)) for cat in self.categorias])
+        return pesos[self.codigo_categoria]
+
+    def vecinos(self, fila, k=10, distancia=DISTANCIA_COSENO, pesos_categoria=None, mascara=None):
+        """
+        Los k jugadores más parecidos a `fila` (posición en el consolidado).
+
+        `mascara` (booleana sobre el consolidado) restringe los candidatos.
+        Devuelve (posiciones en el consolidado, similitud) ordenados de más a
+        menos parecido; la similitud es el coseno (-1 a 1) o la distancia
+        euclídea cambiada de signo, de modo que en ambos casos mayor es mejor.
+        """
+        raiz_pesos = np.sqrt(self.pesos_metricas(pesos_categoria))
+        vectores = self.vectores * raiz_pesos
+        x = vectores[self.posicion[fila]]
+
+        if distancia == DISTANCIA_COSENO:
+            normas = np.linalg.norm(vectores, axis=1) * np.linalg.norm(x)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                similitud = np.where(normas > 0, vectores @ x / normas, 0.0)
+        else:
+            similitud = -np.linalg.norm(vectores - x, axis=1)
+
+        candidatos = self.claves != self.claves[self.posicion[fila]]
+        if mascara is not None:
+            candidatos &= mascara[self.filas]
+        indices = np.flatnonzero(candidatos)
+        k = min(k, len(indices))
+        if k == 0:
+            return self.filas[:0], similitud[:0]
+
+        mejores = indices[np.argpartition(-similitud[indices], k - 1)[:k]]
+        mejores = mejores[np.argsort(-similitud[mejores], kind='stable')]
+        return self.filas[mejores], similitud[mejores]
+
+
+@cache_medido(st.cache_resource)
+def indice_similitud(version, minutos_minimos):
+    """
+    Índice de similitud sobre los percentiles globales de calcular_percentiles_variables
+    en el pool de `minutos_minimos` (una fila por jugador: las filas repetidas del
+    consolidado se quedan fuera)
+    """
+    df, _ = load_data(version)
+    catalogo = catalogo_metricas(version)
+    cubo = calcular_cubo_percentiles(version, minutos_minimos)
+    jugadores = indice_jugadores(version)
+
+    filas = np.flatnonzero((df['minutos_totales'] >= minutos_minimos).to_numpy() & jugadores.es_primera)
+    capa = cubo.percentiles(CONTEXTO_GLOBAL, filas=filas)
+    # Mismas métricas y mismo relleno (0 sin dato) que calcular_percentiles_variables
+    con_datos = ~np.isnan(capa).all(axis=0)
+    metricas = [metrica for metrica, usar in zip(cubo.metricas, con_datos) if usar]
+    percentiles = np.nan_to_num(capa[:, con_datos], nan=0.0)
+
+    categoria_metrica = [catalogo.categoria.get(metrica, 'Otras') for metrica in metricas]
+    return IndiceSimilitud(percentiles, filas, jugadores.claves[filas], metricas, categoria_metrica)
@@ -0,0 +1,66 @@
+"""
+Formato y colores de las tablas de resultados sin formateadores por celda
+"""
+import inspect
+
+import numpy as np
+import streamlit as st
+
+from scouting.rendimiento import medir
+
+# Formatos printf de columna para column_config
+FORMATO_DECIMAL = '%.2f'
+FORMATO_ENTERO = '%d'
+FORMATO_PORCENTAJE = '%.2f%%'
+
+# Streamlit anterior a color= en ProgressColumn: barras de un solo color
+_BARRAS_CON_COLOR = 'color' in inspect.signature(st.column_config.ProgressColumn).parameters
+
+
+def columna_gradiente(col, valores, formato, vmin=None, vmax=None):
+    """
+    Columna con barra de progreso coloreada (rojo bajo, verde alto) en el rango de la columna.
+
+    `vmin`/`vmax` fijan el rango (por ejemplo 0-100 para scores); sin rango
+    útil (columna vacía o constante) se devuelve una columna numérica.
+    """
+    with np.errstate(all='ignore'):
+        valores = np.asarray(valores, dtype=float)
+        minimo = np.nanmin(valores) if vmin is None and np.isfinite(valores).any() else vmin
+        maximo = np.nanmax(valores) if vmax is None and np.isfinite(valores).any() else vmax
+    if minimo is None or maximo is None or not maximo > minimo:
+        return st.column_config.NumberColumn(col, format=formato)
+
+    opciones = {'color': 'auto'} if _BARRAS_CON_COLOR else {}
+    return st.column_config.ProgressColumn(
+        col, format=formato, min_value=float(minimo), max_value=float(maximo), **opciones
+    )
+
+
+def mostrar_tabla(df, formatos, columnas_gradiente=(), height=600, vmin=None, vmax=None):
+    """
+    Muestra df con los números nativos y formato por columna vía column_config.
+
+    `formatos` es {columna: FORMATO_*}. Las columnas_gradiente se muestran
+    como barras coloreadas por el propio navegador: no se genera CSS por celda
+    y el coste no depende del número de filas.
+    """
+    with medir('estilo'):
+        column_config = {
+            col: st.column_config.NumberColumn(col, format=formato)
+            for col, formato in formatos.items() if col in df.columns
+        }
+        for col in columnas_gradiente:
+            if col in df.columns:
+                column_config[col] = columna_gradiente(
+                    col, df[col].to_numpy(dtype=float, na_value=np.nan), formatos.get(col), vmin, vmax
+                )
+
+    with medir('serializacion'):
+        st.dataframe(
+            df,
+            width='stretch',
+            height=height,
+            hide_index=True,
+            column_config=column_config
+        )
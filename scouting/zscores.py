@@ -0,0 +1,77 @@
+"""
+Matrices de Z-Score por pool de comparación y competencia
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from scouting.cache_disco import derivado_en_disco
+from scouting.datos import load_data
+from scouting.filtros import pool_comparacion
+from scouting.rendimiento import cache_medido
+
+
+def matriz_zscores(df_pool, diccionario):
+    """
+    Z-Score de cada métrica del diccionario dentro de df_pool.
+
+    Las métricas invertidas cambian de signo (mayor valor = peor). Se descartan
+    las métricas con menos de 2 valores o desviación estándar nula.
+    """
+    dicc = diccionario[diccionario['metrica'].isin(df_pool.columns)].drop_duplicates('metrica')
+    metricas = dicc['metrica'].tolist()
+    signo = np.where(dicc['Invertir'].fillna(False).astype(bool).to_numpy(), -1.0, 1.0)
+
+    valores = df_pool[metricas]
+    media = valores.mean().to_numpy()
+    std = valores.std().to_numpy()
+    validas = (valores.count().to_numpy() >= 2) & (std != 0)
+
+    z = (valores.to_numpy(dtype=float)[:, validas] - media[validas]) / std[validas] * signo[validas]
+    return pd.DataFrame(z, index=df_pool.index, columns=np.array(metricas)[validas])
+
+
+@cache_medido(st.cache_data)
+def calcular_zscores_competencia(version, min_minutos, competencias, temporadas, edad_range, competencia):
+    """
+    Matriz de Z-Score para los porteros de `competencia` dentro del pool filtrado
+    """
+    return zscores_en_disco(version, min_minutos, competencias, temporadas, edad_range, competencia)
+
+
+def zscores_en_disco(version, min_minutos, competencias, temporadas, edad_range, competencia):
+    """
+    Igual que calcular_zscores_competencia sin la caché en memoria: lee o
+    escribe el artefacto en disco (lo usa también el precálculo offline)
+    """
+    df, diccionario = load_data(version)
+
+    def calcular():
+        df_pool = pool_comparacion(version, min_minutos, competencias, temporadas, edad_range)
+        df_competencia = df_pool[df_pool['Competencia'] == competencia]
+        zscores = matriz_zscores(df_competencia, diccionario)
+        # Posiciones en el consolidado, para reconstruir el índice al leer de disco
+        return {
+            'zscores': zscores.to_numpy(),
+            'filas': df.index.get_indexer(df_competencia.index),
+            'columnas': np.array(zscores.columns, dtype=str),
+        }
+
+    config = (min_minutos, sorted(competencias), sorted(temporadas), edad_range, competencia)
+    arrays = derivado_en_disco('zscores', version, config, calcular)
+    return pd.DataFrame(
+        arrays['zscores'], index=df.index[arrays['filas']], columns=arrays['columnas'].tolist()
+    )
+
+
+def datos_stripplot(zscores, variables, nombre_map, filas_jugador):
+    """
+    Formato largo (Variable, Z-Score, Es_Jugador_Seleccionado) para el gráfico de una categoría
+    """
+    z_cat = zscores[[v for v in variables if v in zscores.columns]]
+    df_zscore = z_cat.rename(columns=nombre_map).melt(
+        var_name='Variable', value_name='Z-Score', ignore_index=False
+    )
+    df_zscore = df_zscore[df_zscore['Z-Score'].notna()]
+    df_zscore['Es_Jugador_Seleccionado'] = df_zscore.index.isin(filas_jugador)
+    return df_zscore.reset_index(drop=True)